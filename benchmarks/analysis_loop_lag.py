@@ -0,0 +1,111 @@
+"""
+Measures how long the event loop is held up while large pastes are analysed, inline and through the analysis pool.
+
+Run from the repository root: python -m benchmarks.analysis_loop_lag
+"""
+import asyncio
+import random
+import statistics
+import time
+
+from botto.config import parse
+from botto.message_analysis import AnalysisPool, analyse
+from botto.regexes import compile_regexes
+
+TICK_SECONDS = 0.005
+PASTES = 50
+PASTE_LENGTH = 4000
+
+WORDS = [
+    "I",
+    "I'm",
+    "my",
+    "no",
+    "nooo",
+    "yeah",
+    "sincerely",
+    "greatly",
+    "very",
+    "so",
+    "apologise",
+    "apologies",
+    "hug",
+    "pizza",
+    "at",
+    "8pm",
+    "17:30",
+    "(",
+    ",",
+    "...",
+]
+
+
+def make_paste(rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < PASTE_LENGTH:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:PASTE_LENGTH]
+
+
+async def measure_lag(analyse_paste, pastes: list[str]) -> tuple[list[float], float]:
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK_SECONDS * 2)
+    started = time.perf_counter()
+    for paste in pastes:
+        await analyse_paste(paste)
+        # Give other events a chance to run between messages, as the gateway would
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    running = False
+    await ticker_task
+    return lags, elapsed
+
+
+def report(name: str, lags: list[float], elapsed: float):
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p95 = lags_ms[int(len(lags_ms) * 0.95) - 1] if lags_ms else 0.0
+    print(
+        f"{name:>8}: {PASTES} pastes in {elapsed:.2f}s, loop lag "
+        f"mean {statistics.mean(lags_ms or [0]):.1f}ms, p95 {p95:.1f}ms, max {max(lags_ms or [0]):.1f}ms"
+    )
+
+
+async def main():
+    config = parse({})
+    regexes = compile_regexes("123456789012345678", config)
+    rng = random.Random(0)
+    pastes = [make_paste(rng) for _ in range(PASTES)]
+
+    async def inline(paste: str):
+        analyse(regexes, paste)
+
+    lags, elapsed = await measure_lag(inline, pastes)
+    report("inline", lags, elapsed)
+
+    pool = AnalysisPool(threshold=1000, workers=1)
+    pool.start(regexes)
+    # Warm the worker up so process start-up isn't counted
+    await pool.analyse(regexes, pastes[0])
+
+    async def offloaded(paste: str):
+        await pool.analyse(regexes, paste)
+
+    lags, elapsed = await measure_lag(offloaded, pastes)
+    report("pool", lags, elapsed)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Compares scheduling a large backlog of reminders as APScheduler date jobs against the reminder dispatcher, by memory
+held, cost of scheduling and how late a burst of due reminders is sent.
+
+Run from the repository root: python -m benchmarks.reminder_dispatcher
+"""
+import asyncio
+import gc
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from botto.models import Reminder
+from botto.reminder_dispatcher import ReminderDispatcher
+from botto.storage.reminder_store import LocalReminderStore
+
+REMINDERS = 100_000
+BURST = 500
+BURST_SECONDS = 2.0
+SPREAD_DAYS = 90
+
+logging.getLogger("apscheduler").setLevel(logging.WARNING)
+
+
+def backlog(rng: random.Random) -> list[Reminder]:
+    """
+    Reminders spread over the coming months, none of them due during the benchmark.
+    """
+    start = datetime.now(timezone.utc) + timedelta(hours=2)
+    return make_reminders(rng, REMINDERS, start, SPREAD_DAYS * 86400)
+
+
+def burst(rng: random.Random) -> list[Reminder]:
+    """
+    Reminders all due within a couple of seconds, to measure how promptly they're sent.
+    """
+    start = datetime.now(timezone.utc) + timedelta(seconds=1)
+    return make_reminders(rng, BURST, start, BURST_SECONDS, advance_share=0)
+
+
+def make_reminders(
+    rng: random.Random,
+    count: int,
+    start: datetime,
+    spread_seconds: float,
+    advance_share: float = 0.3,
+) -> list[Reminder]:
+    reminders = []
+    for _ in range(count):
+        reminders.append(
+            Reminder(
+                id=f"rec{rng.getrandbits(64):016x}",
+                date=start + timedelta(seconds=rng.random() * spread_seconds),
+                notes="Reminder about something or other",
+                remind_15_minutes_before=rng.random() < advance_share,
+                msg_id=str(rng.getrandbits(60)),
+                channel_id=str(rng.getrandbits(60)),
+            )
+        )
+    return reminders
+
+
+def report(name: str, memory: int, scheduling: float, lateness: list[float]):
+    lateness_ms = sorted(late * 1000 for late in lateness)
+    p95 = lateness_ms[int(len(lateness_ms) * 0.95) - 1]
+    print(
+        f"{name:>12}: {memory / 1024 / 1024:6.1f}MiB held, scheduled in {scheduling:5.2f}s, "
+        f"{len(lateness_ms)} sent late by mean {statistics.mean(lateness_ms):.1f}ms, "
+        f"p95 {p95:.1f}ms, max {lateness_ms[-1]:.1f}ms"
+    )
+
+
+async def wait_for_burst(lateness: list[float]):
+    deadline = time.monotonic() + BURST_SECONDS + 5
+    while len(lateness) < BURST and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+
+
+async def bench_apscheduler(rng: random.Random):
+    lateness = []
+
+    async def send(due_at: float):
+        lateness.append(time.time() - due_at)
+
+    def schedule(reminder: Reminder):
+        if reminder.remind_15_minutes_before:
+            scheduler.add_job(
+                send,
+                id=reminder.id + "_advance",
+                trigger="date",
+                next_run_time=reminder.date - timedelta(minutes=15),
+                misfire_grace_time=300,
+                kwargs={"due_at": (reminder.date - timedelta(minutes=15)).timestamp()},
+            )
+        scheduler.add_job(
+            send,
+            id=reminder.id,
+            trigger="date",
+            next_run_time=reminder.date,
+            misfire_grace_time=300,
+            kwargs={"due_at": reminder.date.timestamp()},
+        )
+
+    reminders = backlog(rng)
+    scheduler = AsyncIOScheduler()
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for reminder in reminders:
+        schedule(reminder)
+    scheduler.start()
+    scheduling = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for reminder in burst(rng):
+        schedule(reminder)
+    await wait_for_burst(lateness)
+    scheduler.shutdown(wait=False)
+    report("apscheduler", memory, scheduling, lateness)
+
+
+async def bench_dispatcher(rng: random.Random, store_path: str):
+    lateness = []
+
+    async def send(batch: list[tuple[Reminder, bool]]):
+        for reminder, _ in batch:
+            lateness.append(time.time() - reminder.date.timestamp())
+
+    reminders = backlog(rng)
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    store = LocalReminderStore(store_path)
+    store.apply(reminders, [])
+    dispatcher = ReminderDispatcher(store, fire=send, missed=lambda reminder: None)
+    dispatcher.start()
+    await asyncio.sleep(0)
+    scheduling = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for reminder in burst(rng):
+        store.put(reminder)
+        dispatcher.add(reminder)
+    await wait_for_burst(lateness)
+    dispatcher.stop()
+    report("dispatcher", memory, scheduling, lateness)
+    print(f"{'':>12}  {dispatcher.stats()}")
+    store.close()
+
+
+async def main():
+    await bench_apscheduler(random.Random(0))
+    with tempfile.TemporaryDirectory() as directory:
+        await bench_dispatcher(
+            random.Random(0), os.path.join(directory, "reminders.db")
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
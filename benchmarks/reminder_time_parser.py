@@ -0,0 +1,81 @@
+"""
+Compares the reminder time parser against parsing everything with dateutil, over a corpus of reminder times.
+
+Run from the repository root: python -m benchmarks.reminder_time_parser [corpus]
+
+The corpus is a text file with one reminder time per line. A sample is included in benchmarks/corpus/reminder_times.txt.
+"""
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import arrow
+import dateutil.parser
+
+from botto.reminder_time_parser import ReminderTimeParser
+
+DEFAULT_CORPUS = Path(__file__).parent / "corpus" / "reminder_times.txt"
+ROUNDS = 200
+NOW = datetime(2021, 10, 4, 10, 15)
+
+
+def parse_with_dateutil(text: str):
+    # What parse_reminder_time used to do with each time, before any timezone lookups
+    parsed = dateutil.parser.parse(text, default=NOW.replace(hour=0, minute=0))
+    return arrow.get(arrow.get(parsed)).datetime
+
+
+def try_parse(parse, text: str):
+    try:
+        return parse(text)
+    except (ValueError, OverflowError):
+        return None
+
+
+def time_parsing(parse, times: list[str]) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in times:
+            try_parse(parse, text)
+    return time.perf_counter() - started
+
+
+def main():
+    # Times with zone abbreviations make dateutil warn on every parse
+    warnings.simplefilter("ignore", dateutil.parser.UnknownTimezoneWarning)
+    corpus = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    times = [line.strip() for line in corpus.read_text().splitlines() if line.strip()]
+
+    parser = ReminderTimeParser()
+    mismatches = []
+    for text in times:
+        old = try_parse(parse_with_dateutil, text)
+        new = try_parse(lambda value: parser.parse(value, NOW), text)
+        if old is not None and (new is None or new.replace(tzinfo=None) != old.replace(tzinfo=None)):
+            mismatches.append((text, old, new))
+        if old is None and new is not None:
+            print(f"Newly understood: {text!r} as {new}")
+    for text, old, new in mismatches:
+        print(f"Mismatch: {text!r} was {old}, now {new}")
+    print(parser.stats())
+
+    fast_times = [text for text in times if parser._parse_fast(text, NOW) is not None]
+    report("All times", times)
+    report("Fast path", fast_times)
+
+
+def report(name: str, times: list[str]):
+    parser = ReminderTimeParser()
+    dateutil_seconds = time_parsing(parse_with_dateutil, times)
+    parser_seconds = time_parsing(lambda value: parser.parse(value, NOW), times)
+    parses = ROUNDS * len(times)
+    print(
+        f"{name} ({len(times)}): dateutil {dateutil_seconds / parses * 1e6:.1f}µs per time, "
+        f"parser {parser_seconds / parses * 1e6:.1f}µs per time ({dateutil_seconds / parser_seconds:.1f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
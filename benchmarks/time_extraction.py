@@ -0,0 +1,116 @@
+"""
+Compares time extraction against the regex it replaced, over a corpus of recorded messages.
+
+Run from the repository root: python -m benchmarks.time_extraction [corpus]
+
+The corpus is a text file with one message per line. A small sample is included in benchmarks/corpus/messages.txt.
+"""
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import arrow
+
+from botto.date_helpers import convert_24_hours
+from botto.time_extraction import extract_times, localise_times
+from botto.zone_registry import ZoneRegistry
+
+DEFAULT_CORPUS = Path(__file__).parent / "corpus" / "messages.txt"
+ROUNDS = 200
+TIMEZONE = "Europe/London"
+NEXT_DAY_THRESHOLD = timedelta(hours=6)
+ZONES = ZoneRegistry()
+
+CONVERT_TIME = re.compile(
+    r"(?:^|[\s\-–—])(?P<time>(?P<hours>[0-2]?[0-9])(?P<minutes>:\d\d)?\s?(?P<am_pm>AM|PM)?(?:\s?\+\d\d?(?::\d\d)?(?::\d\d)?)?)",
+    re.IGNORECASE,
+)
+
+
+def is_time(maybe_time: re.Match) -> bool:
+    if maybe_time.group("hours"):
+        if maybe_time.group("minutes"):
+            return True
+        elif am_pm := maybe_time.group("am_pm"):
+            if am_pm.upper() in ("AM", "PM"):
+                return True
+    return False
+
+
+def regex_times(content: str) -> list:
+    time_matches = [
+        match for match in CONVERT_TIME.finditer(content) if is_time(match)
+    ]
+    parsed_local_times = []
+    for match in time_matches:
+        hours = int(match.group("hours"))
+        minutes = match.group("minutes")
+        ampm = match.group("am_pm")
+        minutes = int(minutes[1:]) if minutes else 0
+        hours = convert_24_hours(hours, ampm.lower() == "pm") if ampm else hours
+        now = arrow.now()
+        try:
+            parsed_time = now.replace(
+                hour=hours, minute=minutes, second=0, tzinfo=TIMEZONE
+            )
+        except ValueError:
+            continue
+        if now - parsed_time > NEXT_DAY_THRESHOLD:
+            parsed_time = parsed_time + timedelta(days=1)
+        parsed_local_times.append((match.group(0), parsed_time))
+    return parsed_local_times
+
+
+def extracted_times(content: str) -> list:
+    mentions = extract_times(content)
+    if not mentions:
+        return []
+    return localise_times(
+        mentions,
+        zones=ZONES,
+        zone_name=TIMEZONE,
+        now=datetime.now(timezone.utc),
+        next_day_threshold=NEXT_DAY_THRESHOLD,
+    )
+
+
+def run(name: str, func, corpus: list[str]) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for content in corpus:
+            func(content)
+    elapsed = time.perf_counter() - started
+    per_message = elapsed / (ROUNDS * len(corpus)) * 1_000_000
+    print(f"{name:>10}: {elapsed:.3f}s, {per_message:.2f}µs per message")
+    return elapsed
+
+
+def main():
+    corpus_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    corpus = corpus_path.read_text(encoding="utf-8").splitlines()
+
+    mismatches = 0
+    mentioning = 0
+    for content in corpus:
+        expected = [text for text, _ in regex_times(content)]
+        actual = [mention.text for mention, _ in extracted_times(content)]
+        if expected:
+            mentioning += 1
+        if expected != actual:
+            mismatches += 1
+            print(f"Mismatch for {content!r}: {expected} != {actual}")
+    digit_free = sum(1 for content in corpus if not any(c.isdigit() for c in content))
+    print(
+        f"{len(corpus)} messages, {mentioning} mentioning times, {digit_free} without digits, "
+        f"{mismatches} mismatches"
+    )
+
+    before = run("regex", regex_times, corpus)
+    after = run("extractor", extracted_times, corpus)
+    print(f"{before / after:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
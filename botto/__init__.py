@@ -4,5 +4,7 @@ import logging.config
 logging.config.fileConfig(fname="log.conf", disable_existing_loggers=False)
 logging.getLogger("discord").setLevel(logging.CRITICAL)
 logging.getLogger("discord.gateway").setLevel(logging.INFO)
+# Rate limits are only reported as warnings, and are counted from them. Other discord.http warnings are logged too.
+logging.getLogger("discord.http").setLevel(logging.WARNING)
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 logging.getLogger("urllib").setLevel(logging.CRITICAL)
\ No newline at end of file
@@ -0,0 +1,43 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+class ChannelActivity:
+    """
+    Remembers who has recently posted in each channel.
+    """
+
+    def __init__(self, window_seconds: float = 3600, max_authors: int = 100):
+        self.window_seconds = window_seconds
+        self.max_authors = max_authors
+        self.channels: dict[int, OrderedDict[int, float]] = {}
+
+    def seen(self, channel_id: int, author_id: int, at: Optional[float] = None):
+        authors = self.channels.setdefault(channel_id, OrderedDict())
+        authors[author_id] = at if at is not None else time.monotonic()
+        authors.move_to_end(author_id)
+        while len(authors) > self.max_authors:
+            authors.popitem(last=False)
+
+    def active(self, channel_id: int) -> list[int]:
+        """
+        Gets the authors who have posted in the channel within the window, most recent first.
+        """
+        if not (authors := self.channels.get(channel_id)):
+            return []
+        cutoff = time.monotonic() - self.window_seconds
+        # Authors are kept in the order they last posted, so expired ones are at the front
+        while authors and next(iter(authors.values())) < cutoff:
+            authors.popitem(last=False)
+        if not authors:
+            del self.channels[channel_id]
+            return []
+        return list(reversed(authors))
+
+    def forget_channel(self, channel_id: int):
+        self.channels.pop(channel_id, None)
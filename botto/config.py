@@ -43,6 +43,20 @@ def parse(config):
         },
         "channels": {"include": [], "exclude": [], "voting": ["voting"]},
         "any_channel_voting_guilds": ["880491989995499600"],
+        "vote_evaluation_delay_seconds": 1.5,
+        "vote_evaluation_max_delay_seconds": 5,
+        "delete_confirmation_seconds": 3,
+        "reaction_interval_seconds": 0.25,
+        "entity_cache": {
+            "channel_ttl_seconds": 3600,
+            "user_ttl_seconds": 3600,
+            "message_ttl_seconds": 300,
+            "max_channels": 1000,
+            "max_users": 5000,
+            "max_messages": 2000,
+        },
+        "long_message_threshold": 1000,
+        "analysis_workers": 1,
         "reactions": {
             "success": "📥",
             "repeat": "♻️",
@@ -171,7 +185,7 @@ def parse(config):
         "triggers": {
             "meal_time": ["!meal(?:time)?s?$"],
             "timezones": ["!times?"],
-            "job_schedule": ["!schedule"],
+            "job_schedule": ["!schedule(?:\s+(?P<filters>.*))?"],
             "yell": ["!bottoyellat(?P<person>[^.]*)(?:\.(?P<text>.*))?"],
             "reminder_explain": ["!remind(?:er)? (?P<timestamp>[^.]*).(?P<text>.*)"],
             "remove_reactions": [
@@ -192,7 +206,16 @@ def parse(config):
             "intro_text": ["Reminder!"],
         },
         "time_is_next_day_threshold_hours": 6,
+        "group_time_conversions": False,
+        "active_author_minutes": 60,
+        "time_conversion_memo_seconds": 300,
         "reminder_channel": "833842753799848019",
+        "reminder_store": "reminders.db",
+        "reminder_misfire_grace_seconds": 300,
+        "reminder_horizon_minutes": 60,
+        "reminder_prepare_seconds": 60,
+        "reminder_batch_seconds": 10,
+        "slow_reminder_seconds": 5,
         "should_reply": True,
         "approval_reaction": "mottoapproval",
         "leaderboard_link": None,
@@ -237,6 +260,9 @@ def parse(config):
     if threshold := decode_base64_env("TLDBOTTO_NEXT_DAY_THRESHOLD"):
         defaults["time_is_next_day_threshold_hours"] = int(threshold)
 
+    if reminder_store := os.getenv("TLDBOTTO_REMINDER_STORE"):
+        defaults["reminder_store"] = reminder_store
+
     if id := os.getenv("TLDBOTTO_ID"):
         defaults["id"] = id
 
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Awaitable, Hashable
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+@dataclass
+class _PendingCall:
+    handle: asyncio.TimerHandle
+    first_requested: float
+    func: Callable[[], Awaitable]
+
+
+class Debouncer:
+    """
+    Coalesces repeated requests for the same key into a single call.
+
+    A call runs once no new request for its key has arrived for `delay` seconds, but never later than `max_delay`
+    seconds after the first request it covers. Calls for the same key never overlap, and always use the most recently
+    requested function.
+    """
+
+    def __init__(self, delay: float, max_delay: float):
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self.pending: dict[Hashable, _PendingCall] = {}
+        self.running: dict[Hashable, asyncio.Task] = {}
+        self.requests = 0
+        self.calls = 0
+
+    def schedule(self, key: Hashable, func: Callable[[], Awaitable]):
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        self.requests += 1
+        first_requested = now
+        if pending := self.pending.get(key):
+            pending.handle.cancel()
+            first_requested = pending.first_requested
+        run_at = min(now + self.delay, first_requested + self.max_delay)
+        handle = loop.call_at(run_at, self._run, key)
+        self.pending[key] = _PendingCall(handle, first_requested, func)
+
+    def _run(self, key: Hashable):
+        pending = self.pending.pop(key)
+        previous = self.running.get(key)
+        self.calls += 1
+        task = asyncio.create_task(self._call(key, previous, pending.func))
+        self.running[key] = task
+
+    async def _call(
+        self, key: Hashable, previous: asyncio.Task, func: Callable[[], Awaitable]
+    ):
+        try:
+            if previous and not previous.done():
+                await asyncio.wait([previous])
+            await func()
+        except Exception:
+            log.error(f"Debounced call for {key} failed", exc_info=True)
+        finally:
+            if self.running.get(key) is asyncio.current_task():
+                del self.running[key]
+
+    def cancel(self, key: Hashable):
+        if pending := self.pending.pop(key, None):
+            pending.handle.cancel()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union, Callable, Awaitable, Hashable, TypeVar, Generic
+
+import discord
+from discord.abc import GuildChannel, PrivateChannel
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+Channel = Union[GuildChannel, PrivateChannel, discord.Thread]
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A size-bounded, least-recently-used cache whose entries expire after a fixed time.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.in_flight: dict[K, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: K) -> bool:
+        return self.peek(key) is not None
+
+    def peek(self, key: K) -> Optional[V]:
+        if entry := self.entries.get(key):
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                return value
+            del self.entries[key]
+        return None
+
+    def get(self, key: K) -> Optional[V]:
+        value = self.peek(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: K):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def get_or_fetch(self, key: K, fetch: Callable[[], Awaitable[V]]) -> V:
+        if (value := self.get(key)) is not None:
+            return value
+        # Share a single request between everyone asking for the same missing entry
+        if not (fetching := self.in_flight.get(key)):
+            fetching = asyncio.create_task(fetch())
+            self.in_flight[key] = fetching
+        try:
+            value = await asyncio.shield(fetching)
+        finally:
+            self.in_flight.pop(key, None)
+        self.put(key, value)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"{self.name}: {len(self.entries)}/{self.max_size} entries, "
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.1%}), {self.evictions} evictions"
+        )
+
+
+@dataclass
+class CachedMessage:
+    message: discord.Message
+    reactions_stale: bool = False
+
+
+class EntityCache:
+    """
+    Caches the channels, users and messages we'd otherwise repeatedly fetch from Discord.
+
+    The client's own gateway caches are always checked first. Messages are invalidated when they are edited or
+    deleted, and have their reactions marked as stale when reactions change, so callers that rely on
+    `Message.reactions` can ask for a fresh copy.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        channel_ttl_seconds: float = 3600,
+        user_ttl_seconds: float = 3600,
+        message_ttl_seconds: float = 300,
+        max_channels: int = 1000,
+        max_users: int = 5000,
+        max_messages: int = 2000,
+    ):
+        self.client = client
+        self.channels: TTLCache[int, Channel] = TTLCache(
+            "Channels", channel_ttl_seconds, max_channels
+        )
+        self.users: TTLCache[int, discord.User] = TTLCache(
+            "Users", user_ttl_seconds, max_users
+        )
+        self.messages: TTLCache[int, CachedMessage] = TTLCache(
+            "Messages", message_ttl_seconds, max_messages
+        )
+
+    async def get_channel(self, channel_id: int) -> Channel:
+        channel_id = int(channel_id)
+        if channel := self.client.get_channel(channel_id):
+            self.channels.hits += 1
+            return channel
+        return await self.channels.get_or_fetch(
+            channel_id, lambda: self.client.fetch_channel(channel_id)
+        )
+
+    async def get_user(self, user_id: int) -> discord.User:
+        user_id = int(user_id)
+        if user := self.client.get_user(user_id):
+            self.users.hits += 1
+            return user
+        return await self.users.get_or_fetch(
+            user_id, lambda: self.client.fetch_user(user_id)
+        )
+
+    async def get_message(
+        self,
+        channel: discord.abc.Messageable,
+        message_id: int,
+        fresh: bool = False,
+        with_reactions: bool = False,
+    ) -> discord.Message:
+        """
+        Gets a message, only fetching it if we don't have a usable copy.
+        :param channel: The channel the message was posted in
+        :param message_id: The ID of the message
+        :param fresh: Always fetch the message
+        :param with_reactions: Fetch the message if reactions have changed since it was cached
+        :return: The message
+        """
+        message_id = int(message_id)
+        if fresh:
+            self.messages.invalidate(message_id)
+        elif with_reactions and (cached := self.messages.peek(message_id)):
+            if cached.reactions_stale:
+                self.messages.invalidate(message_id)
+
+        async def fetch() -> CachedMessage:
+            return CachedMessage(await channel.fetch_message(message_id))
+
+        cached = await self.messages.get_or_fetch(message_id, fetch)
+        return cached.message
+
+    def put_message(self, message: discord.Message):
+        self.messages.put(message.id, CachedMessage(message))
+
+    def invalidate_messages(self, *message_ids: int):
+        self.messages.invalidate(*message_ids)
+
+    def invalidate_channel(self, channel_id: int):
+        self.channels.invalidate(channel_id)
+
+    def reactions_changed(self, message_id: int):
+        if cached := self.messages.peek(message_id):
+            cached.reactions_stale = True
+
+    def stats(self) -> list[str]:
+        return [cache.stats() for cache in (self.channels, self.users, self.messages)]
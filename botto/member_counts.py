@@ -0,0 +1,56 @@
+import logging
+from typing import Iterable
+
+import discord
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+class MemberCounts:
+    """
+    Keeps a count of non-bot members for each guild, updated from member events.
+    """
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+
+    def get(self, guild: discord.Guild) -> int:
+        if (count := self.counts.get(guild.id)) is None:
+            count = self.reconcile(guild)
+        return count
+
+    def reconcile(self, guild: discord.Guild) -> int:
+        count = len([member for member in guild.members if not member.bot])
+        previous_count = self.counts.get(guild.id)
+        if previous_count is not None and previous_count != count:
+            log.warning(
+                f"Member count for {guild} drifted from {previous_count} to {count}"
+            )
+        self.counts[guild.id] = count
+        return count
+
+    def reconcile_all(self, guilds: Iterable[discord.Guild]):
+        for guild in guilds:
+            self.reconcile(guild)
+        log.debug(f"Reconciled member counts for {len(self.counts)} guilds")
+
+    def forget(self, guild: discord.Guild):
+        self.counts.pop(guild.id, None)
+
+    def _adjust(self, guild: discord.Guild, difference: int):
+        # Counts we haven't calculated yet will be worked out in full on first use
+        if guild.id in self.counts:
+            self.counts[guild.id] += difference
+
+    def member_joined(self, member: discord.Member):
+        if not member.bot:
+            self._adjust(member.guild, 1)
+
+    def member_removed(self, member: discord.Member):
+        if not member.bot:
+            self._adjust(member.guild, -1)
+
+    def member_updated(self, before: discord.Member, after: discord.Member):
+        if before.bot != after.bot:
+            self._adjust(after.guild, -1 if after.bot else 1)
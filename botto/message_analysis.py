@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .regexes import SuggestionRegexes
+from .time_extraction import TimeMention, extract_times
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+@dataclass(frozen=True)
+class ReactionMatch:
+    rule: str
+    value: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TriggerMatch:
+    name: str
+    groups: dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class MessageAnalysis:
+    trigger: Optional[TriggerMatch]
+    reactions: tuple[ReactionMatch, ...]
+    times: tuple[TimeMention, ...] = ()
+
+
+def _search_triggers(
+    content: str, trigger_dict: dict[str, list[re.Pattern]]
+) -> Optional[TriggerMatch]:
+    for name, triggers in trigger_dict.items():
+        for trigger in triggers:
+            if matched := trigger.match(content):
+                return TriggerMatch(name, matched.groupdict())
+
+
+def match_trigger(regexes: SuggestionRegexes, content: str) -> Optional[TriggerMatch]:
+    at_command = None
+    for t in regexes.at_command:
+        if match := t.match(content):
+            if command_group := match.group("command"):
+                at_command = command_group.strip()
+    if at_command:
+        return _search_triggers(at_command, regexes.at_triggers)
+    else:
+        return _search_triggers(content, regexes.triggers)
+
+
+def match_reactions(
+    regexes: SuggestionRegexes, content: str
+) -> tuple[ReactionMatch, ...]:
+    """
+    Works out which reaction rules a message matches, in the order they should be applied.
+    Picking the actual emoji is left until the reactions are applied.
+    """
+    matches = []
+    if regexes.apologising.search(content) and not regexes.sorry.search(content):
+        matches.append(ReactionMatch("rule_1"))
+    if regexes.sorry.search(content):
+        matches.append(ReactionMatch("sorry"))
+    if regexes.love.search(content):
+        matches.append(ReactionMatch("love"))
+    if regexes.hug.search(content):
+        matches.append(ReactionMatch("hug"))
+    if party_match := regexes.party.search(content):
+        matches.append(ReactionMatch("party", party_match.group("partyword")))
+    if food := regexes.food.food_regex.search(content):
+        matches.append(ReactionMatch("food", food.group(1)))
+    elif regexes.food.not_food_regex.search(content):
+        matches.append(ReactionMatch("unrecognised_food"))
+    if pattern_name := regexes.patterns.matches(content):
+        matches.append(ReactionMatch("pattern", pattern_name))
+    return tuple(matches)
+
+
+def analyse(regexes: SuggestionRegexes, content: str) -> MessageAnalysis:
+    return MessageAnalysis(
+        trigger=match_trigger(regexes, content),
+        reactions=match_reactions(regexes, content),
+        times=extract_times(content),
+    )
+
+
+_worker_regexes: Optional[SuggestionRegexes] = None
+
+
+def _init_worker(regexes: SuggestionRegexes):
+    global _worker_regexes
+    _worker_regexes = regexes
+
+
+def _analyse_in_worker(content: str) -> MessageAnalysis:
+    return analyse(_worker_regexes, content)
+
+
+class AnalysisPool:
+    """
+    Analyses long messages in worker processes, so one large paste doesn't hold up the event loop.
+
+    Workers are forked with the compiled regexes already in place, and only the message content and the match
+    results cross the process boundary. Shorter messages are analysed inline, where it's cheaper than the round trip.
+    """
+
+    def __init__(self, threshold: int = 1000, workers: int = 1):
+        self.threshold = threshold
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.offloaded = 0
+
+    def start(self, regexes: SuggestionRegexes):
+        self.shutdown()
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Forking skips re-importing the bot and recompiling the regexes in each worker
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(regexes,),
+            )
+
+    async def analyse(self, regexes: SuggestionRegexes, content: str) -> MessageAnalysis:
+        if self.executor is None or len(content) < self.threshold:
+            return analyse(regexes, content)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executor, _analyse_in_worker, content
+            )
+        except BrokenProcessPool:
+            log.warning("Analysis worker died. Restarting the pool.", exc_info=True)
+            self.start(regexes)
+            return analyse(regexes, content)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def stats(self) -> str:
+        return f"Long message analysis: {self.offloaded} offloaded to {self.workers} workers (threshold {self.threshold} characters)"
+
+
+class AnalysisCache:
+    """
+    Remembers the analysis of recently seen message content, as busy channels repeat the same short messages a lot.
+
+    Entries are keyed on the exact content, since matching is sensitive to case, whitespace and punctuation.
+    """
+
+    def __init__(self, max_entries: int = 2000, max_content_length: int = 200):
+        self.max_entries = max_entries
+        self.max_content_length = max_content_length
+        self.entries: OrderedDict[str, MessageAnalysis] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, content: str) -> Optional[MessageAnalysis]:
+        if analysis := self.entries.get(content):
+            self.hits += 1
+            self.entries.move_to_end(content)
+            return analysis
+        self.misses += 1
+        return None
+
+    def put(self, content: str, analysis: MessageAnalysis):
+        if len(content) > self.max_content_length:
+            return
+        self.entries[content] = analysis
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"Message analysis: {len(self.entries)}/{self.max_entries} entries, "
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.1%})"
+        )
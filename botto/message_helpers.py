@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Union, Optional, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING, Iterable
 
 import discord
 from discord import Message
@@ -12,18 +12,30 @@ log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
 
-async def remove_user_reactions(
-    message: Message, user: Union[discord.abc.User, discord.ClientUser]
+async def remove_own_reactions(
+    message: Message,
+    own_user: discord.ClientUser,
+    known_reactions: Iterable[str] = (),
 ):
     """
-    Removes all reactions by the user from the message.
+    Removes all of our reactions from the message.
     :param message: The message from which to remove reactions
-    :param user: The user for which reactions should be removed
+    :param own_user: Our user
+    :param known_reactions: Reactions we know we've added, in addition to those the message reports
     """
-    log.info(f"Removing reactions by {user} from {message}")
-    my_reactions = [r for r in message.reactions if any(u.id == user.id async for u in r.users())]
-    clearing_reactions = [message.remove_reaction(r.emoji, user) for r in my_reactions]
-    await asyncio.wait(clearing_reactions)
+    log.info(f"Removing reactions by {own_user} from {message}")
+    own_reactions = list(
+        set(known_reactions) | {str(r.emoji) for r in message.reactions if r.me}
+    )
+    clearing_reactions = [message.remove_reaction(r, own_user) for r in own_reactions]
+    results = await asyncio.gather(*clearing_reactions, return_exceptions=True)
+    # Carry on if one can't be removed, such as a custom emoji that has since been deleted
+    for reaction, result in zip(own_reactions, results):
+        if isinstance(result, Exception):
+            log.warning(
+                f"Failed to remove reaction {reaction} from message {message.id}",
+                exc_info=result,
+            )
 
 
 async def remove_own_message(
@@ -55,8 +67,8 @@ async def resolve_message_reference(
 
     reference_channel = await bot.get_or_fetch_channel(message.reference.channel_id)
 
-    referenced_message = await reference_channel.fetch_message(
-        message.reference.message_id
+    referenced_message = await bot.get_or_fetch_message(
+        reference_channel, message.reference.message_id, fresh=force_fresh
     )
     return referenced_message
 
@@ -65,10 +77,6 @@ def is_voting_message(message: Message) -> bool:
     return message.content.lstrip().startswith("🗳️")
 
 
-def guild_member_count(message: Message) -> int:
-    return len([member for member in message.guild.members if not member.bot])
-
-
 class MessageMissingReferenceError(Exception):
     def __init__(self, message: Message, *args: object) -> None:
         self.message = message
@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from .zone_registry import ZoneOffset, ZoneRegistry
+
+
+@dataclass
+class OffsetGroup:
+    offset: ZoneOffset
+    names: list[str] = field(default_factory=list)
+
+
+def group_by_offset(
+    zones: ZoneRegistry, names_by_zone: dict[str, list[str]], now: datetime
+) -> list[OffsetGroup]:
+    """
+    Merges zones that are currently the same offset from UTC, so each offset only needs converting once.
+    :param zones: The registry to look offsets up in
+    :param names_by_zone: The names of people in each zone, keyed by the zone's name
+    :param now: The time to get offsets for
+    :return: The groups, from furthest behind UTC to furthest ahead
+    """
+    groups: dict[timedelta, OffsetGroup] = {}
+    for zone_name, names in names_by_zone.items():
+        zone_offset = zones.offset(zone_name, now)
+        group = groups.setdefault(zone_offset.offset, OffsetGroup(zone_offset))
+        group.names.extend(names)
+    return sorted(groups.values(), key=lambda group: group.offset.offset)
+
+
+def describe_groups(
+    instant: datetime, groups: list[OffsetGroup], max_names: int = 5
+) -> list[str]:
+    """
+    Describes an instant as a local time for each group, e.g. "> Tue 20:00 (UTC+0100): Alice, Bob".
+    """
+    lines = []
+    for group in groups:
+        local_time = instant + group.offset.offset
+        names = ", ".join(sorted(group.names)[:max_names])
+        if (extra := len(group.names) - max_names) > 0:
+            names = f"{names} and {extra} more"
+        lines.append(
+            f"> {local_time:%a %H:%M} (UTC{group.offset.format()}): {names}"
+        )
+    return lines
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Callable, Awaitable, NamedTuple
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+class DeletionKey(NamedTuple):
+    message_id: int
+    user_id: int
+    emoji: str
+
+
+class PendingDeletions:
+    """
+    Holds delete requests made by reaction until they've been left in place for long enough to be deliberate.
+
+    Each request commits on a timer unless the matching reaction is removed first.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.pending: dict[DeletionKey, asyncio.TimerHandle] = {}
+        # The event loop only keeps weak references to tasks, so hold on to them until they're done
+        self.committing: set[asyncio.Task] = set()
+
+    def add(self, key: DeletionKey, commit: Callable[[], Awaitable]):
+        self.cancel(key)
+        loop = asyncio.get_event_loop()
+        self.pending[key] = loop.call_later(self.delay, self._commit, key, commit)
+
+    def cancel(self, key: DeletionKey) -> bool:
+        if handle := self.pending.pop(key, None):
+            handle.cancel()
+            return True
+        return False
+
+    def cancel_message(self, message_id: int):
+        for key in [key for key in self.pending if key.message_id == message_id]:
+            self.cancel(key)
+
+    def _commit(self, key: DeletionKey, commit: Callable[[], Awaitable]):
+        del self.pending[key]
+        task = asyncio.create_task(self._run(key, commit))
+        self.committing.add(task)
+        task.add_done_callback(self.committing.discard)
+
+    @staticmethod
+    async def _run(key: DeletionKey, commit: Callable[[], Awaitable]):
+        try:
+            await commit()
+        except Exception:
+            log.error(f"Failed to commit deletion {key}", exc_info=True)
@@ -0,0 +1,37 @@
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+class ReactionLedger:
+    """
+    Records the reactions we have added to each message, as reported by raw reaction events.
+    """
+
+    def __init__(self, max_messages: int = 5000):
+        self.max_messages = max_messages
+        self.reactions: OrderedDict[int, set[str]] = OrderedDict()
+
+    def get(self, message_id: int) -> set[str]:
+        return set(self.reactions.get(message_id, ()))
+
+    def added(self, message_id: int, emoji: str):
+        self.reactions.setdefault(message_id, set()).add(emoji)
+        self.reactions.move_to_end(message_id)
+        while len(self.reactions) > self.max_messages:
+            self.reactions.popitem(last=False)
+
+    def removed(self, message_id: int, emoji: str):
+        if emojis := self.reactions.get(message_id):
+            emojis.discard(emoji)
+            if not emojis:
+                del self.reactions[message_id]
+
+    def cleared(self, message_id: int, emoji: Optional[str] = None):
+        if emoji is None:
+            self.reactions.pop(message_id, None)
+        else:
+            self.removed(message_id, emoji)
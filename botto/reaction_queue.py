@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import discord
+from discord import Message
+
+from .reaction_ledger import ReactionLedger
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+class RateLimitCounter(logging.Filter):
+    """
+    Counts the rate limits discord.py handles internally, which it only reports through its logs.
+
+    Only sees the records discord.http is configured to log, so its warnings need to be enabled for anything to be
+    counted. The rate limits it counts aren't logged, since they're reported in the stats instead.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rate_limits = 0
+        self.reaction_rate_limits = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        if "rate limited" not in message:
+            return True
+        self.rate_limits += 1
+        if "/reactions/" in message:
+            self.reaction_rate_limits += 1
+        return False
+
+
+@dataclass
+class QueuedReaction:
+    message: Union[Message, discord.PartialMessage]
+    emoji: str
+    result: asyncio.Future
+
+
+class ReactionQueue:
+    """
+    Sends our reactions one channel at a time, in the order they were requested.
+
+    Requests are paced to Discord's per-channel reaction rate limit, reactions we've already added are skipped, and
+    reactions for messages that have been deleted are dropped.
+    """
+
+    def __init__(
+        self, interval: float = 0.25, ledger: Optional[ReactionLedger] = None
+    ):
+        self.interval = interval
+        self.ledger = ledger if ledger is not None else ReactionLedger()
+        self.queues: dict[int, deque[QueuedReaction]] = {}
+        self.workers: dict[int, asyncio.Task] = {}
+        self.last_sent: dict[int, float] = {}
+        self.sent = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.rate_limit_counter = RateLimitCounter()
+        logging.getLogger("discord.http").addFilter(self.rate_limit_counter)
+
+    def _already_reacted(self, message: Message, emoji: str) -> bool:
+        if emoji in self.ledger.get(message.id):
+            return True
+        return any(
+            r.me and str(r.emoji) == emoji for r in getattr(message, "reactions", [])
+        )
+
+    def add(
+        self, message: Union[Message, discord.PartialMessage], emoji: str
+    ) -> asyncio.Future:
+        """
+        Queues a reaction to be added to the message.
+        :param message: The message to react to
+        :param emoji: The reaction to add
+        :return: A future that completes once the reaction has been added (or skipped)
+        """
+        emoji = str(emoji)
+        channel_id = message.channel.id
+        queue = self.queues.setdefault(channel_id, deque())
+        for queued in queue:
+            if queued.message.id == message.id and queued.emoji == emoji:
+                self.skipped += 1
+                return queued.result
+        result = asyncio.get_event_loop().create_future()
+        if self._already_reacted(message, emoji):
+            self.skipped += 1
+            result.set_result(None)
+            return result
+        queue.append(QueuedReaction(message, emoji, result))
+        if channel_id not in self.workers:
+            self.workers[channel_id] = asyncio.create_task(self._send(channel_id))
+        return result
+
+    async def add_all(
+        self, message: Union[Message, discord.PartialMessage], emojis: list[str]
+    ):
+        results = await asyncio.gather(
+            *[self.add(message, emoji) for emoji in emojis], return_exceptions=True
+        )
+        for emoji, result in zip(emojis, results):
+            # Reactions to deleted messages were already logged when they were dropped
+            if isinstance(result, Exception) and not isinstance(result, discord.NotFound):
+                log.error(
+                    f"Failed to add reaction {emoji} to message {message.id}",
+                    exc_info=result,
+                )
+
+    def cancel_message(self, message_id: int):
+        for queue in self.queues.values():
+            for queued in [q for q in queue if q.message.id == message_id]:
+                queue.remove(queued)
+                queued.result.set_result(None)
+                self.cancelled += 1
+
+    async def _send(self, channel_id: int):
+        queue = self.queues[channel_id]
+        worker_started = time.monotonic()
+        try:
+            while queue:
+                queued = queue.popleft()
+                if queued.result.done():
+                    continue
+                wait = (
+                    self.last_sent.get(channel_id, 0) + self.interval - time.monotonic()
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    await queued.message.add_reaction(queued.emoji)
+                    self.ledger.added(queued.message.id, queued.emoji)
+                    self.sent += 1
+                    if not queued.result.done():
+                        queued.result.set_result(None)
+                except discord.NotFound as error:
+                    log.info(
+                        f"Message {queued.message.id} not found. Dropping its reactions."
+                    )
+                    self.failed += 1
+                    self.cancel_message(queued.message.id)
+                    if not queued.result.done():
+                        queued.result.set_exception(error)
+                except Exception as error:
+                    self.failed += 1
+                    if not queued.result.done():
+                        queued.result.set_exception(error)
+                finally:
+                    self.last_sent[channel_id] = time.monotonic()
+        finally:
+            self.busy_seconds += time.monotonic() - worker_started
+            del self.workers[channel_id]
+            if not queue:
+                self.queues.pop(channel_id, None)
+
+    def stats(self) -> str:
+        rate = self.sent / self.busy_seconds if self.busy_seconds else 0.0
+        return (
+            f"Reactions: {self.sent} sent ({rate:.2f}/s per busy channel), {self.skipped} skipped, "
+            f"{self.cancelled} cancelled, {self.failed} failed, "
+            f"{self.rate_limit_counter.reaction_rate_limits} reaction rate limits "
+            f"({self.rate_limit_counter.rate_limits} overall)"
+        )
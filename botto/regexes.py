@@ -29,7 +29,6 @@ class SuggestionRegexes:
     patterns: PatternReactions
     triggers: dict[str, list[Pattern]]
     at_triggers: dict[str, list[Pattern]]
-    convert_time: Pattern
 
 
 laugh_emojis = "[😆😂🤣]"
@@ -102,9 +101,5 @@ def compile_regexes(bot_user_id: str, config: dict) -> SuggestionRegexes:
         patterns=PatternReactions(config["pattern_reactions"]),
         triggers=trigger_dict,
         at_triggers=at_trigger_dict,
-        convert_time=re.compile(
-            r"(?:^|[\s\-–—])(?P<time>(?P<hours>[0-2]?[0-9])(?P<minutes>:\d\d)?\s?(?P<am_pm>AM|PM)?(?:\s?\+\d\d?(?::\d\d)?(?::\d\d)?)?)",
-            re.IGNORECASE,
-        ),
     )
     return regexes
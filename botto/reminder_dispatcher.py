@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from .models import Reminder
+from .storage.reminder_store import LocalReminderStore
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+ADVANCE_NOTICE = timedelta(minutes=15)
+
+
+class ReminderDispatcher:
+    """
+    Fires reminders at their due times, keeping only the ones due within the horizon in memory.
+
+    Every reminder lives in the local store, indexed by when it's due. Each time the loaded window runs low, the next
+    horizon's worth is paged in from the store and pushed onto a heap of (fire time, version, ID, advance, preparing)
+    entries, so the cost of holding a reminder in memory is only paid shortly before it fires. Changing or removing a
+    reminder bumps or drops its version, which leaves any entries already on the heap to be skipped when they come up.
+
+    If given a `prepare` callback, each reminder is also prepared a little before it fires, so anything slow can be
+    done ahead of time.
+
+    Reminders for the same channel that fall due within `batch_seconds` of each other are fired together, once the last
+    of them is due. A reminder with nothing due shortly after it in its channel is fired straight away.
+    """
+
+    def __init__(
+        self,
+        store: LocalReminderStore,
+        fire: Callable[[list[tuple[Reminder, bool]]], Awaitable],
+        missed: Callable[[Reminder], None],
+        prepare: Optional[Callable[[Reminder, bool], Awaitable]] = None,
+        horizon_seconds: float = 3600,
+        misfire_grace_seconds: float = 300,
+        prepare_seconds: float = 60,
+        batch_seconds: float = 0,
+        max_batch: int = 10,
+    ):
+        """
+        :param store: Where every scheduled reminder is kept
+        :param fire: Sends a batch of reminders for the same channel, given each reminder and whether it's the advance
+            notice
+        :param missed: Called for each reminder whose due time passed more than the grace period ago
+        :param prepare: Gets ready to send a reminder, given the reminder and whether it's the advance notice
+        :param horizon_seconds: How far ahead to load reminders from the store
+        :param misfire_grace_seconds: How late a reminder can be and still be sent, such as one restored from the store
+            at startup
+        :param prepare_seconds: How long before each reminder fires to prepare it
+        :param batch_seconds: How close together reminders for the same channel have to be to fire together
+        :param max_batch: The most reminders to fire together
+        """
+        self.store = store
+        self.fire = fire
+        self.missed = missed
+        self.prepare = prepare
+        self.horizon_seconds = horizon_seconds
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.prepare_seconds = prepare_seconds
+        self.batch_seconds = batch_seconds
+        self.max_batch = max_batch
+        self.heap: list[tuple[float, int, str, bool, bool]] = []
+        self.due_soon: dict[str, tuple[Reminder, int]] = {}
+        self.loaded_until = 0.0
+        self.versions = itertools.count()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks, so hold on to them until they're done
+        self.sending: set[asyncio.Task] = set()
+        self.fired = 0
+        self.batches = 0
+        self.missed_count = 0
+        self.pages = 0
+
+    @staticmethod
+    def _fire_times(reminder: Reminder) -> list[tuple[float, bool]]:
+        due_at = reminder.date.timestamp()
+        fire_times = [(due_at, False)]
+        if reminder.remind_15_minutes_before:
+            fire_times.append((due_at - ADVANCE_NOTICE.total_seconds(), True))
+        return fire_times
+
+    def _push(self, reminder: Reminder, version: int, start: float, end: float) -> bool:
+        pushed = False
+        for fire_at, advance in self._fire_times(reminder):
+            if start <= fire_at < end:
+                heapq.heappush(
+                    self.heap, (fire_at, version, reminder.id, advance, False)
+                )
+                if self.prepare:
+                    heapq.heappush(
+                        self.heap,
+                        (fire_at - self.prepare_seconds, version, reminder.id, advance, True),
+                    )
+                pushed = True
+        return pushed
+
+    def _page_in(self, until: float):
+        start = self.loaded_until
+        # Advance notices fire before their reminder is due, so look that much further ahead for them
+        for reminder in self.store.due_between(
+            start, until + ADVANCE_NOTICE.total_seconds()
+        ):
+            if current := self.due_soon.get(reminder.id):
+                version = current[1]
+            else:
+                version = next(self.versions)
+            if self._push(reminder, version, start, until):
+                self.due_soon[reminder.id] = (reminder, version)
+        self.loaded_until = until
+        self.pages += 1
+
+    def add(self, reminder: Reminder):
+        """
+        Schedules a new or changed reminder. It must already be in the store, so it can be paged in later.
+
+        The grace period is only for reminders that were scheduled in time. One that's already due when it's added,
+        such as one a sync brought back after it was sent, is missed, and an advance notice that's already due is
+        skipped.
+        """
+        now = time.time()
+        if reminder.date.timestamp() < now:
+            self.due_soon.pop(reminder.id, None)
+            log.warning(f"Missed reminder '{reminder.id}' due at {reminder.date}, as it was added late")
+            self.missed_count += 1
+            self.missed(reminder)
+            return
+        version = next(self.versions)
+        if self._push(reminder, version, now, self.loaded_until):
+            self.due_soon[reminder.id] = (reminder, version)
+        else:
+            self.due_soon.pop(reminder.id, None)
+        if self.wakeup:
+            self.wakeup.set()
+
+    def remove(self, reminder_id: str):
+        self.due_soon.pop(reminder_id, None)
+
+    def _take(self, entry: tuple[float, int, str, bool, bool]) -> Optional[Reminder]:
+        """
+        Gets the reminder for an entry popped from the heap, unless the reminder has since changed or been removed.
+        """
+        _, version, reminder_id, advance, preparing = entry
+        current = self.due_soon.get(reminder_id)
+        if current is None or current[1] != version:
+            return None
+        if not (advance or preparing):
+            del self.due_soon[reminder_id]
+        return current[0]
+
+    def _fire_due(self, now: float):
+        batches: dict[Optional[str], list[tuple[Reminder, bool]]] = {}
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not (reminder := self._take(entry)):
+                continue
+            fire_at, _, reminder_id, advance, preparing = entry
+            if preparing:
+                if now - fire_at - self.prepare_seconds <= self.misfire_grace_seconds:
+                    self._spawn(self._prepare(reminder, advance))
+                continue
+            if now - fire_at > self.misfire_grace_seconds:
+                if not advance:
+                    log.warning(f"Missed reminder '{reminder_id}' due at {reminder.date}")
+                    self.missed_count += 1
+                    self.missed(reminder)
+                continue
+            batches.setdefault(reminder.channel_id, []).append((reminder, advance))
+        if not batches:
+            return
+        send_at = self._gather(batches, now + self.batch_seconds)
+        for channel_id, batch in batches.items():
+            for start in range(0, len(batch), self.max_batch):
+                self.fired += len(batch[start : start + self.max_batch])
+                self.batches += 1
+                self._spawn(
+                    self._fire(
+                        batch[start : start + self.max_batch],
+                        send_at.get(channel_id, now),
+                    )
+                )
+
+    def _spawn(self, coroutine: Awaitable):
+        task = asyncio.create_task(coroutine)
+        self.sending.add(task)
+        task.add_done_callback(self.sending.discard)
+
+    def _gather(
+        self, batches: dict[Optional[str], list[tuple[Reminder, bool]]], until: float
+    ) -> dict[Optional[str], float]:
+        """
+        Adds the reminders due before `until` to the batches for their channels.
+        :return: When the last reminder added to each batch is due
+        """
+        send_at = {}
+        held = []
+        while self.heap and self.heap[0][0] <= until:
+            entry = heapq.heappop(self.heap)
+            fire_at, version, reminder_id, advance, preparing = entry
+            current = self.due_soon.get(reminder_id)
+            if current is None or current[1] != version:
+                continue
+            if preparing or current[0].channel_id not in batches:
+                held.append(entry)
+                continue
+            reminder = self._take(entry)
+            batches[reminder.channel_id].append((reminder, advance))
+            send_at[reminder.channel_id] = fire_at
+        for entry in held:
+            heapq.heappush(self.heap, entry)
+        return send_at
+
+    async def _fire(self, batch: list[tuple[Reminder, bool]], send_at: float):
+        if (delay := send_at - time.time()) > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self.fire(batch)
+        except Exception:
+            log.error(
+                f"Failed to send reminders {[reminder.id for reminder, _ in batch]}",
+                exc_info=True,
+            )
+
+    async def _prepare(self, reminder: Reminder, advance: bool):
+        try:
+            await self.prepare(reminder, advance)
+        except Exception:
+            log.warning(f"Failed to prepare reminder '{reminder.id}'", exc_info=True)
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            refill_at = self.loaded_until - self.horizon_seconds / 2
+            if now >= refill_at:
+                self._page_in(now + self.horizon_seconds)
+                refill_at = self.loaded_until - self.horizon_seconds / 2
+            self._fire_due(now)
+            next_at = min(self.heap[0][0], refill_at) if self.heap else refill_at
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(), timeout=max(0.0, next_at - time.time())
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.task and not self.task.done():
+            return
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def stats(self) -> str:
+        return (
+            f"Reminders: {len(self.due_soon)} due soon of {self.store.count()} stored, "
+            f"{self.fired} sent in {self.batches} batches, {self.missed_count} missed, {self.pages} pages loaded"
+        )
@@ -0,0 +1,77 @@
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .models import Reminder
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+def reminder_hash(reminder: Reminder) -> str:
+    """
+    Fingerprints everything about a reminder that affects how it's scheduled or sent.
+    """
+    content = repr(
+        (
+            reminder.date.isoformat(),
+            reminder.notes,
+            bool(reminder.remind_15_minutes_before),
+            reminder.msg_id,
+            reminder.channel_id,
+        )
+    )
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ReminderDiff:
+    added: list[Reminder] = field(default_factory=list)
+    modified: list[Reminder] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.modified)} modified, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged"
+        )
+
+
+def diff_reminders(
+    known: dict[str, tuple[str, float]],
+    reminders: Iterable[Reminder],
+    listed_at: float,
+    forgotten: Optional[dict[str, float]] = None,
+) -> ReminderDiff:
+    """
+    Compares a full listing of reminders against the ones already stored locally.
+    :param known: The content hash of each stored reminder, and when it was stored, keyed by ID
+    :param reminders: Every reminder in storage
+    :param listed_at: When the listing started, from time.time(). Reminders stored after this are newer than the
+        listing, so aren't counted as removed just because it doesn't include them.
+    :param forgotten: When reminders were dropped locally, keyed by ID. Ones dropped after the listing started, such
+        as reminders sent while it was in progress, aren't added back just because it still includes them.
+    :return: The reminders that need scheduling, rescheduling or unscheduling
+    """
+    diff = ReminderDiff()
+    forgotten = forgotten or {}
+    seen = set()
+    for reminder in reminders:
+        seen.add(reminder.id)
+        entry = known.get(reminder.id)
+        if entry is None and forgotten.get(reminder.id, 0) >= listed_at:
+            continue
+        if entry is None:
+            diff.added.append(reminder)
+        elif entry[0] != reminder_hash(reminder):
+            diff.modified.append(reminder)
+        else:
+            diff.unchanged += 1
+    diff.removed = [
+        reminder_id
+        for reminder_id, (_, stored_at) in known.items()
+        if reminder_id not in seen and stored_at < listed_at
+    ]
+    return diff
@@ -1,23 +1,37 @@
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Callable
+from typing import Callable, Optional
 
-import arrow
-import dateutil.parser
 import discord
-from apscheduler import events
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from botto import reactions
 from .date_helpers import is_naive
 from .models import Reminder
+from .reminder_dispatcher import ADVANCE_NOTICE, ReminderDispatcher
+from .reminder_index import ReminderDiff, diff_reminders
+from .reminder_metrics import DeliveryTiming, ReminderMetrics
+from .reminder_time_parser import ReminderTimeParser
 from .storage import TimezoneStorage
 from .storage.reminder_storage import ReminderStorage
+from .storage.reminder_store import LocalReminderStore
 
 log = logging.getLogger(__name__)
 
 
+@dataclass
+class ReminderDelivery:
+    channel: discord.abc.Messageable
+    reference: Optional[discord.MessageReference] = None
+
+
+def delivery_key(reminder: Reminder, advance: bool) -> str:
+    return reminder.id + "_advance" if advance else reminder.id
+
+
 class ReminderManager:
     def __init__(
         self,
@@ -34,80 +48,130 @@ class ReminderManager:
         self.timezones = timezones
         self.missed_job_ids = []
         self.get_channel_func = None
+        self.get_message_func = None
+        self.sync_lock = asyncio.Lock()
+        self.prepared: dict[str, ReminderDelivery] = {}
+        # When each reminder was last dropped locally, so a sync already in progress doesn't bring it back
+        self.forgotten: dict[str, float] = {}
+        self.metrics = ReminderMetrics(config.get("slow_reminder_seconds", 5))
+        self.time_parser = ReminderTimeParser()
 
-        initial_refresh_run = datetime.now() + timedelta(seconds=5)
         scheduler.add_job(
             self.refresh_reminders,
             name="Refresh reminders",
             trigger="cron",
             hour="*/1",
             coalesce=True,
-            next_run_time=initial_refresh_run,
         )
 
-        scheduler.add_listener(self.handle_scheduler_event, events.EVENT_JOB_MISSED)
-
-    def handle_scheduler_event(self, event: events.JobEvent):
-        if job := self.scheduler.get_job(event.job_id):
-            if job.name.startswith("Reminder:") and not event.job_id.endswith(
-                "_advance"
-            ):
-                self.missed_job_ids.append(event.job_id)
-
-    async def refresh_reminders(self):
-        reminders_processed = 0
-        async for reminder in self.storage.retrieve_reminders():
-            if reminder.remind_15_minutes_before:
-                self.scheduler.add_job(
-                    self.send_reminder,
-                    id=reminder.id + "_advance",
-                    name=f"Reminder: {reminder.notes.strip()} in 15 minutes!",
-                    trigger="date",
-                    next_run_time=reminder.date - timedelta(minutes=15),
-                    coalesce=True,
-                    replace_existing=True,
-                    kwargs={
-                        "reminder_id": reminder.id + "_advance",
-                        "notes": f"{reminder.notes.strip()} in 15 minutes!",
-                        "message_id": reminder.msg_id,
-                        "channel_id": reminder.channel_id,
-                    },
-                )
-            self.scheduler.add_job(
-                self.send_reminder,
-                id=reminder.id,
-                name=f"Reminder: {reminder.notes.strip()} now ({reminder.date})!",
-                trigger="date",
-                next_run_time=reminder.date,
-                coalesce=True,
-                replace_existing=True,
-                kwargs={
-                    "reminder_id": reminder.id,
-                    "notes": f"{reminder.notes.strip()} now ({reminder.date})!",
-                    "message_id": reminder.msg_id,
-                    "channel_id": reminder.channel_id,
-                },
+        # Reminders restored from here are sent as soon as the bot starts, without waiting for Airtable to be crawled
+        self.local_store = LocalReminderStore(config.get("reminder_store"))
+        self.dispatcher = ReminderDispatcher(
+            self.local_store,
+            fire=self.send_reminders,
+            missed=self.handle_missed_reminder,
+            prepare=self.prepare_reminder,
+            horizon_seconds=config.get("reminder_horizon_minutes", 60) * 60,
+            misfire_grace_seconds=config.get("reminder_misfire_grace_seconds", 300),
+            prepare_seconds=config.get("reminder_prepare_seconds", 60),
+            batch_seconds=config.get("reminder_batch_seconds", 10),
+        )
+        log.info(
+            f"Loaded {self.local_store.count()} reminders from {self.local_store.path}"
+        )
+
+    def handle_missed_reminder(self, reminder: Reminder):
+        self.metrics.missed()
+        self.missed_job_ids.append(reminder.id)
+        # If the reminder can't be cleaned up, the next sync will schedule it again
+        self.forget_reminder(reminder.id)
+
+    def schedule_reminder(self, reminder: Reminder, requester_id: Optional[int] = None):
+        self.local_store.put(reminder, requester_id)
+        self.discard_prepared(reminder.id)
+        self.dispatcher.add(reminder)
+
+    def discard_prepared(self, reminder_id: str):
+        self.prepared.pop(reminder_id, None)
+        self.prepared.pop(reminder_id + "_advance", None)
+
+    def forget_reminder(self, reminder_id: str):
+        self.forgotten[reminder_id] = time.time()
+        self.discard_prepared(reminder_id)
+        self.dispatcher.remove(reminder_id)
+        self.local_store.remove(reminder_id)
+
+    def find_reminders(
+        self,
+        requester_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        within: Optional[timedelta] = None,
+        limit: int = -1,
+    ) -> tuple[list[Reminder], int]:
+        """
+        Finds scheduled reminders from the local copy, without going to Airtable.
+        :return: The reminders, soonest first, and how many matched in total
+        """
+        due_before = time.time() + within.total_seconds() if within else None
+        return self.local_store.find(requester_id, channel_id, due_before, limit)
+
+    async def refresh_reminders(self) -> ReminderDiff:
+        """
+        Brings the scheduled reminders in line with storage, only touching the ones that have changed.
+        """
+        async with self.sync_lock:
+            listed_at = time.time()
+            reminders = [
+                reminder async for reminder in self.storage.retrieve_reminders()
+            ]
+            diff = diff_reminders(
+                self.local_store.known(), reminders, listed_at, self.forgotten
             )
-            reminders_processed += 1
-        log.debug(f"Refreshed {reminders_processed} reminders")
+            # Later listings start after these, so will only include the reminders if they weren't deleted
+            self.forgotten = {
+                reminder_id: forgotten_at
+                for reminder_id, forgotten_at in self.forgotten.items()
+                if forgotten_at >= listed_at
+            }
+            self.local_store.apply(diff.added + diff.modified, diff.removed)
+            for reminder in diff.added + diff.modified:
+                self.discard_prepared(reminder.id)
+                self.dispatcher.add(reminder)
+            for reminder_id in diff.removed:
+                self.discard_prepared(reminder_id)
+                self.dispatcher.remove(reminder_id)
+        log.debug(f"Refreshed {len(reminders)} reminders: {diff}")
+        return diff
 
-    def start(self, get_channel_func: Callable):
+    def start(self, get_channel_func: Callable, get_message_func: Callable):
         self.get_channel_func = get_channel_func
+        self.get_message_func = get_message_func
+        self.dispatcher.start()
         if self.scheduler.state == 0:
             self.scheduler.start()
+            # Reconcile anything restored from the local store with Airtable
+            self.scheduler.add_job(self.refresh_reminders, name="Reconcile reminders")
 
     @property
     def reminder_syntax(self) -> str:
         return "`@TLDBotto !reminder <datetime>. <message>`"
 
     async def cleanup_missed_reminders(self):
-        log.info("Cleaning missed reminders")
-        deletions = [
-            self.storage.remove_reminder(job_id) for job_id in self.missed_job_ids
+        if not self.missed_job_ids:
+            return
+        missed_job_ids = list(dict.fromkeys(self.missed_job_ids))
+        log.info(f"Cleaning {len(missed_job_ids)} missed reminders")
+        failed = await self.storage.remove_reminders(missed_job_ids)
+        # Only drop the IDs that were deleted, keeping any missed while deleting for the next cleanup
+        deleted = set(missed_job_ids) - set(failed)
+        self.missed_job_ids = [
+            job_id for job_id in self.missed_job_ids if job_id not in deleted
         ]
-        await asyncio.gather(*deletions)
-        log.info(f"Deleted job IDs: {self.missed_job_ids}")
-        self.missed_job_ids = []
+        if failed:
+            log.warning(f"Failed to delete missed reminders, will retry: {failed}")
+        log.info(
+            f"Deleted job IDs: {[job_id for job_id in missed_job_ids if job_id not in failed]}"
+        )
 
     async def send_reminder_syntax(self, message: discord.Message, **kwargs):
         log.info("Sending reminder syntax")
@@ -116,52 +180,154 @@ class ReminderManager:
             self.cleanup_missed_reminders(),
         )
 
-    async def send_reminder(
-        self, reminder_id: str, notes: str, message_id: str, channel_id: str
-    ):
-        log.info(f"Sending reminder '{reminder_id}': {notes}")
+    async def resolve_delivery(
+        self, reminder: Reminder, check_message: bool = False
+    ) -> Optional[ReminderDelivery]:
+        """
+        Works out where a reminder should be sent, and which message it should reply to.
+        :param reminder: The reminder to send
+        :param check_message: Make sure the message being replied to still exists, rather than trusting Discord to
+            fall back to a plain message if it doesn't
+        :return: How to send the reminder, if its channel could be found
+        """
+        channel_id = reminder.channel_id or self.config["reminder_channel"]
+        try:
+            channel = await self.get_channel_func(channel_id)
+        except discord.HTTPException:
+            log.warning(f"Failed to fetch channel {channel_id}", exc_info=True)
+            channel = None
+        if not channel:
+            log.warning(f"Unable to send reminder: Channel {channel_id} not found.")
+            return None
+        if not (reminder.channel_id and reminder.msg_id):
+            return ReminderDelivery(channel)
+        reference = discord.MessageReference(
+            message_id=int(reminder.msg_id),
+            channel_id=channel.id,
+            fail_if_not_exists=False,
+        )
+        if check_message:
+            try:
+                message = await self.get_message_func(channel, reminder.msg_id)
+                reference = message.to_reference(fail_if_not_exists=False)
+            except discord.NotFound:
+                log.info(f"Message {reminder.msg_id} was deleted, so won't reply to it")
+                reference = None
+            except discord.HTTPException:
+                log.warning(f"Failed to fetch message {reminder.msg_id}", exc_info=True)
+        return ReminderDelivery(channel, reference)
 
-        reminder_text = f"Reminder: {notes.strip()}"
-        if channel_id := channel_id:
-            if channel := await self.get_channel_func(channel_id):
-                async with channel.typing():
-                    message = None
-                    if message_id := message_id:
-                        message = await channel.fetch_message(message_id)
-                    if message:
-                        await message.reply(reminder_text, tts=True)
-                    else:
-                        await channel.send(reminder_text, tts=True)
-            else:
-                log.warning(f"Unable to send reminder: Channel {channel_id} not found.")
-        else:
-            channel = await self.get_channel_func(self.config["reminder_channel"])
-            async with channel.typing():
-                await channel.send(reminder_text, tts=True)
+    async def prepare_reminder(self, reminder: Reminder, advance: bool):
+        if delivery := await self.resolve_delivery(reminder, check_message=True):
+            self.prepared[delivery_key(reminder, advance)] = delivery
+
+    @staticmethod
+    def reminder_notes(reminder: Reminder, advance: bool) -> str:
+        if advance:
+            return f"{reminder.notes.strip()} in 15 minutes!"
+        return f"{reminder.notes.strip()} now ({reminder.date})!"
+
+    @staticmethod
+    def jump_url(delivery: ReminderDelivery, reminder: Reminder) -> Optional[str]:
+        if not (reminder.channel_id and reminder.msg_id):
+            return None
+        guild_id = guild.id if (guild := getattr(delivery.channel, "guild", None)) else "@me"
+        return f"https://discord.com/channels/{guild_id}/{reminder.channel_id}/{reminder.msg_id}"
+
+    async def send_reminders(self, batch: list[tuple[Reminder, bool]]):
+        """
+        Sends reminders due together in the same channel as a single message, replying to the first.
+        """
+        for reminder, advance in batch:
+            log.info(
+                f"Sending reminder '{delivery_key(reminder, advance)}': {self.reminder_notes(reminder, advance)}"
+            )
+
+        started_at = time.time()
+        # Normally prepared a minute ago, so sending is the only request made now
+        first, first_advance = batch[0]
+        delivery = self.prepared.pop(delivery_key(first, first_advance), None)
+        for reminder, advance in batch[1:]:
+            self.prepared.pop(delivery_key(reminder, advance), None)
+        prepared = delivery is not None
+        if not delivery:
+            delivery = await self.resolve_delivery(first)
+        resolved_at = time.time() if delivery else None
+        sent_at = None
+        try:
+            if delivery:
+                await delivery.channel.send(
+                    self.reminders_text(delivery, batch),
+                    tts=True,
+                    reference=delivery.reference,
+                )
+                sent_at = time.time()
+        finally:
+            self.metrics.batched(len(batch))
+            for reminder, advance in batch:
+                due_at = reminder.date - (ADVANCE_NOTICE if advance else timedelta())
+                self.metrics.delivered(
+                    DeliveryTiming(
+                        reminder_id=delivery_key(reminder, advance),
+                        due_at=due_at.timestamp(),
+                        started_at=started_at,
+                        resolved_at=resolved_at,
+                        sent_at=sent_at,
+                        prepared=prepared,
+                        batch_size=len(batch),
+                    )
+                )
 
-        if not reminder_id.endswith("_advance"):
-            await self.storage.remove_reminder(reminder_id)
+        if sent := [reminder.id for reminder, advance in batch if not advance]:
+            for reminder_id in sent:
+                self.forget_reminder(reminder_id)
+            # Leave anything that couldn't be deleted to be cleaned up with the missed reminders
+            self.missed_job_ids.extend(await self.storage.remove_reminders(sent))
         await self.cleanup_missed_reminders()
 
+    def reminders_text(
+        self, delivery: ReminderDelivery, batch: list[tuple[Reminder, bool]]
+    ) -> str:
+        first, first_advance = batch[0]
+        if len(batch) == 1:
+            return f"Reminder: {self.reminder_notes(first, first_advance)}"
+        lines = ["Reminders:"]
+        for index, (reminder, advance) in enumerate(batch):
+            line = f"- {self.reminder_notes(reminder, advance)}"
+            if index > 0 and (url := self.jump_url(delivery, reminder)):
+                line += f" {url}"
+            lines.append(line)
+        return "\n".join(lines)
+
     async def parse_reminder_time(self, timestamp: str, requester: discord.Member) -> datetime:
+        zone_name = None
+        if tlder := await self.timezones.get_tlder(str(requester.id)):
+            zone_name = (await self.timezones.get_timezone(tlder.timezone_id)).name
+        else:
+            log.warning(f"Found no TLDer: {requester}")
+        if zone_name:
+            local_now = self.timezones.zones.local_time(zone_name)
+        else:
+            local_now = datetime.now(timezone.utc)
         try:
-            parsed_date = dateutil.parser.parse(timestamp)
-            was_parsed_date_naive = is_naive(parsed_date)
-            parsed_date = arrow.get(parsed_date)
-            if was_parsed_date_naive:
-                if tlder := await self.timezones.get_tlder(str(requester.id)):
-                    tldr_timezone = await self.timezones.get_timezone(tlder.timezone_id)
-                    log.debug(f"Parsed reminder datetime: {parsed_date}")
-                    parsed_date = arrow.get(parsed_date).replace(tzinfo=tldr_timezone.name)
-                    log.debug(f"Timezone-adjusted reminder datetime: {parsed_date}")
-                else:
-                    log.warning(f"Found no TLDer: {requester}")
-            near_now = arrow.utcnow() + timedelta(minutes=1)
-            if parsed_date.to(timezone.utc) < near_now:
-                raise TimeTravelError(parsed_date.datetimed, near_now.datetime)
-            return parsed_date.datetime
-        except (TypeError, dateutil.parser.ParserError) as error:
+            parsed_date = self.time_parser.parse(
+                timestamp, local_now.replace(tzinfo=None)
+            )
+        except (TypeError, ValueError, OverflowError) as error:
             raise ReminderParsingError() from error
+        log.debug(f"Parsed reminder datetime: {parsed_date}")
+        if is_naive(parsed_date):
+            if zone_name:
+                parsed_date = self.timezones.zones.local_time(
+                    zone_name, self.timezones.zones.to_utc(zone_name, parsed_date)
+                )
+                log.debug(f"Timezone-adjusted reminder datetime: {parsed_date}")
+            else:
+                parsed_date = parsed_date.replace(tzinfo=timezone.utc)
+        near_now = datetime.now(timezone.utc) + timedelta(minutes=1)
+        if parsed_date < near_now:
+            raise TimeTravelError(parsed_date, near_now)
+        return parsed_date
 
     async def build_reminder_message(self, reminder: Reminder):
         channel_text = ""
@@ -185,6 +351,7 @@ class ReminderManager:
         msg_id,
         channel_id,
         force_advance_reminder: bool = False,
+        requester_id: Optional[int] = None,
     ):
         advance_reminder = force_advance_reminder or "🕰" in text
         log.debug(f"Creating reminder. Advance warning: {advance_reminder}")
@@ -197,6 +364,8 @@ class ReminderManager:
             advance_reminder=advance_reminder,
         )
         log.info(f"Created reminder: {created_reminder}")
+        # Schedule straight from the created record, rather than waiting for the next sync
+        self.schedule_reminder(created_reminder, requester_id)
         return created_reminder
 
     async def add_reminder_message(
@@ -223,9 +392,10 @@ class ReminderManager:
                 text=text,
                 msg_id=reply_to.id,
                 channel_id=reply_to.channel.id,
+                requester_id=reply_to.author.id,
             )
             await reply_to.reply(await self.build_reminder_message(created_reminder))
-        await asyncio.gather(self.refresh_reminders(), self.cleanup_missed_reminders())
+        await self.cleanup_missed_reminders()
 
     async def add_reminder_slash(
         self,
@@ -243,8 +413,9 @@ class ReminderManager:
             msg_id=None,
             channel_id=channel.id,
             force_advance_reminder=advance_reminder,
+            requester_id=requester.id,
         )
-        await asyncio.gather(self.refresh_reminders(), self.cleanup_missed_reminders())
+        await self.cleanup_missed_reminders()
         return created_reminder
 
 
@@ -0,0 +1,133 @@
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+LAG_BOUNDS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300)
+
+
+class LagHistogram:
+    """
+    Counts durations into fixed buckets, so percentiles can be estimated without keeping every sample.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = LAG_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += 1
+        self.max = max(self.max, seconds)
+
+    def quantile(self, fraction: float) -> float:
+        """
+        The upper bound of the bucket the given fraction of samples fall within.
+        """
+        if not self.total:
+            return 0.0
+        wanted = fraction * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max)
+        return self.max
+
+    def buckets(self) -> str:
+        labels = [f"≤{bound}s" for bound in self.bounds] + [f">{self.bounds[-1]}s"]
+        return ", ".join(
+            f"{label}: {count}" for label, count in zip(labels, self.counts) if count
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"p50 ≤{self.quantile(0.5):.2f}s, p95 ≤{self.quantile(0.95):.2f}s, p99 ≤{self.quantile(0.99):.2f}s, "
+            f"max {self.max:.2f}s over {self.total}"
+        )
+
+
+@dataclass
+class DeliveryTiming:
+    """
+    When each stage of sending a reminder happened, as Unix timestamps.
+    """
+
+    reminder_id: str
+    due_at: float
+    started_at: float
+    resolved_at: Optional[float] = None
+    sent_at: Optional[float] = None
+    prepared: bool = False
+    batch_size: int = 1
+
+    @property
+    def lag(self) -> Optional[float]:
+        return self.sent_at - self.due_at if self.sent_at else None
+
+    def breakdown(self) -> str:
+        def since_due(timestamp: Optional[float]) -> str:
+            return f"+{timestamp - self.due_at:.2f}s" if timestamp else "never"
+
+        return (
+            f"started {since_due(self.started_at)}, "
+            f"channel resolved {since_due(self.resolved_at)}{' (prepared)' if self.prepared else ''}, "
+            f"sent {since_due(self.sent_at)}, in a batch of {self.batch_size}"
+        )
+
+
+class ReminderMetrics:
+    """
+    Tracks how late reminders are sent, and which stage of sending them the time goes on.
+
+    Start lag is from a reminder being due to sending starting, including any wait to batch it with others. Resolving
+    covers finding the channel and the message to reply to, and should be close to nothing when the reminder was
+    prepared ahead of time. Sending is the request to Discord itself.
+    """
+
+    def __init__(self, slow_seconds: float = 5):
+        self.slow_seconds = slow_seconds
+        self.start_lag = LagHistogram()
+        self.resolving = LagHistogram()
+        self.sending = LagHistogram()
+        self.delivery_lag = LagHistogram()
+        self.misfires = 0
+        self.coalesced = 0
+        self.unprepared = 0
+        self.failed = 0
+        self.slow = 0
+
+    def missed(self):
+        self.misfires += 1
+
+    def delivered(self, timing: DeliveryTiming):
+        self.start_lag.record(max(0.0, timing.started_at - timing.due_at))
+        if timing.resolved_at:
+            self.resolving.record(timing.resolved_at - timing.started_at)
+        if not timing.prepared:
+            self.unprepared += 1
+        if not timing.sent_at:
+            self.failed += 1
+            log.warning(f"Failed to send reminder '{timing.reminder_id}': {timing.breakdown()}")
+            return
+        self.sending.record(timing.sent_at - (timing.resolved_at or timing.started_at))
+        self.delivery_lag.record(max(0.0, timing.lag))
+        if timing.lag > self.slow_seconds:
+            self.slow += 1
+            log.warning(f"Slow reminder '{timing.reminder_id}': {timing.breakdown()}")
+
+    def batched(self, size: int):
+        self.coalesced += size - 1
+
+    def stats(self) -> list[str]:
+        return [
+            f"Reminder delivery lag: {self.delivery_lag} ({self.delivery_lag.buckets()})",
+            f"Reminder stages: start lag {self.start_lag}; resolving {self.resolving}; sending {self.sending}",
+            f"Reminder delivery: {self.misfires} missed, {self.coalesced} coalesced into batches, "
+            f"{self.unprepared} not prepared ahead, {self.failed} failed, {self.slow} slower than {self.slow_seconds}s",
+        ]
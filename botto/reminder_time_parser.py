@@ -0,0 +1,134 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+import dateutil.parser
+
+from .date_helpers import convert_24_hours
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+ISO_DATE_TIME = re.compile(
+    r"(?P<date>\d{4}-\d{2}-\d{2})"
+    r"(?:[T ](?P<time>\d{1,2}:\d{2}(?::\d{2}(?:\.\d{3}(?:\d{3})?)?)?))?"
+    r"\s*(?P<offset>Z|[+-]\d{2}:?\d{2})?",
+    re.IGNORECASE,
+)
+DAY_NAMES = {
+    "today": None,
+    "tomorrow": None,
+    "mon": 0,
+    "monday": 0,
+    "tue": 1,
+    "tues": 1,
+    "tuesday": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "thu": 3,
+    "thur": 3,
+    "thurs": 3,
+    "thursday": 3,
+    "fri": 4,
+    "friday": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sun": 6,
+    "sunday": 6,
+}
+_DAY = r"(?P<{name}>" + "|".join(sorted(DAY_NAMES, key=len, reverse=True)) + r")"
+_TIME = r"(?P<hours>\d{1,2})(?::(?P<minutes>\d{2}))?\s*(?P<am_pm>am|pm)?"
+DAY_AND_TIME = re.compile(
+    rf"(?:{_DAY.format(name='day_before')},?\s+(?:at\s+)?)?{_TIME}(?:\s+{_DAY.format(name='day_after')})?",
+    re.IGNORECASE,
+)
+
+
+class ReminderTimeParser:
+    """
+    Parses the times people give for reminders.
+
+    The formats people actually use are matched directly: ISO 8601 dates, times like "14:30" or "9am", and either of
+    those with "today", "tomorrow" or a day of the week. Anything else is handed to dateutil. As with dateutil, a day
+    of the week means the next one on or after today, and a time without a date means today.
+    """
+
+    def __init__(self):
+        self.fast = 0
+        self.fallback = 0
+
+    def parse(self, text: str, now: datetime) -> datetime:
+        """
+        :param text: The time to parse
+        :param now: The current wall-clock time where the text was written, without a tzinfo
+        :return: The parsed time. It only has a tzinfo if the text gave an offset.
+        :raises ValueError: The text couldn't be parsed as a time
+        """
+        text = text.strip()
+        if (parsed := self._parse_fast(text, now)) is not None:
+            self.fast += 1
+            return parsed
+        self.fallback += 1
+        log.debug(f"Falling back to dateutil for {text!r}")
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return dateutil.parser.parse(text, default=today)
+
+    def _parse_fast(self, text: str, now: datetime) -> Optional[datetime]:
+        if match := ISO_DATE_TIME.fullmatch(text):
+            return self._parse_iso(match)
+        if match := DAY_AND_TIME.fullmatch(text):
+            return self._parse_day_and_time(match, now)
+        return None
+
+    @staticmethod
+    def _parse_iso(match: re.Match) -> Optional[datetime]:
+        iso = match.group("date")
+        if clock := match.group("time"):
+            iso += " " + clock.zfill(2 + len(clock) - clock.index(":"))
+        if offset := match.group("offset"):
+            if offset.upper() == "Z":
+                offset = "+00:00"
+            elif ":" not in offset:
+                offset = f"{offset[:3]}:{offset[3:]}"
+            iso += offset
+        try:
+            return datetime.fromisoformat(iso)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_day_and_time(match: re.Match, now: datetime) -> Optional[datetime]:
+        day_before, day_after = match.group("day_before"), match.group("day_after")
+        if day_before and day_after:
+            return None
+        hours = int(match.group("hours"))
+        minutes = int(match.group("minutes") or 0)
+        if am_pm := match.group("am_pm"):
+            if not 1 <= hours <= 12:
+                return None
+            hours = convert_24_hours(hours, am_pm.lower() == "pm")
+        elif match.group("minutes") is None:
+            # A bare number could be anything
+            return None
+        if hours > 23 or minutes > 59:
+            return None
+        parsed = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+        if day := (day_before or day_after):
+            day = day.lower()
+            if day == "tomorrow":
+                parsed += timedelta(days=1)
+            elif (weekday := DAY_NAMES[day]) is not None:
+                parsed += timedelta(days=(weekday - now.weekday()) % 7)
+        return parsed
+
+    @property
+    def hit_rate(self) -> float:
+        parses = self.fast + self.fallback
+        return self.fast / parses if parses else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"Time parsing: {self.fast} fast, {self.fallback} fell back to dateutil "
+            f"({self.hit_rate:.1%} fast)"
+        )
@@ -0,0 +1,81 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import TypeVar
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+T = TypeVar("T")
+
+
+class ReplyMemo:
+    """
+    Remembers the times recently converted in each channel, so the same conversion isn't posted again while the
+    original reply is still in view.
+
+    Conversions are keyed by who mentioned the time and the instant it was converted to, so "8pm" and "20:00" from the
+    same person count as the same conversion.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 200):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.channels: dict[int, OrderedDict[tuple[int, int], float]] = {}
+        self.posted = 0
+        self.suppressed = 0
+
+    def _recent(self, channel_id: int) -> OrderedDict[tuple[int, int], float]:
+        entries = self.channels.setdefault(channel_id, OrderedDict())
+        cutoff = time.monotonic() - self.ttl_seconds
+        while entries and next(iter(entries.values())) < cutoff:
+            entries.popitem(last=False)
+        return entries
+
+    def filter(
+        self, channel_id: int, author_id: int, conversions: list[tuple[T, datetime]]
+    ) -> list[tuple[T, datetime]]:
+        """
+        Drops the conversions that have recently been posted, and remembers the rest as posted.
+        :param channel_id: The channel the reply will be posted in
+        :param author_id: Who mentioned the times
+        :param conversions: Each mentioned time, paired with the instant it was converted to
+        :return: The conversions that still need posting
+        """
+        entries = self._recent(channel_id)
+        now = time.monotonic()
+        fresh = []
+        for conversion in conversions:
+            key = (author_id, int(conversion[1].timestamp()))
+            if key in entries:
+                self.suppressed += 1
+                continue
+            entries[key] = now
+            self.posted += 1
+            fresh.append(conversion)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        if not entries:
+            del self.channels[channel_id]
+        return fresh
+
+    def forget(
+        self, channel_id: int, author_id: int, conversions: list[tuple[T, datetime]]
+    ):
+        """
+        Forgets conversions that were let through but then couldn't be posted, so they can be posted next time.
+        """
+        if (entries := self.channels.get(channel_id)) is None:
+            return
+        for conversion in conversions:
+            if entries.pop((author_id, int(conversion[1].timestamp())), None) is not None:
+                self.posted -= 1
+        if not entries:
+            del self.channels[channel_id]
+
+    def forget_channel(self, channel_id: int):
+        self.channels.pop(channel_id, None)
+
+    def stats(self) -> str:
+        return f"Time conversions: {self.posted} posted, {self.suppressed} suppressed as repeats"
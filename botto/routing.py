@@ -0,0 +1,70 @@
+import logging
+from dataclasses import dataclass
+from typing import Union, Iterable
+
+import discord
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+
+@dataclass(frozen=True)
+class ChannelRoute:
+    voting: bool = False
+    any_message_voting: bool = False
+    included: bool = True
+    excluded: bool = False
+
+    @property
+    def handles_suggestions(self) -> bool:
+        return self.included and not self.excluded
+
+
+def _parse_guild_ids(guild_ids: Union[str, Iterable]) -> frozenset[int]:
+    if isinstance(guild_ids, str):
+        guild_ids = guild_ids.split(",")
+    return frozenset(int(guild_id) for guild_id in guild_ids if str(guild_id).strip())
+
+
+class RoutingTable:
+    """
+    Decides how each channel's messages are handled, compiled from the channel configuration.
+
+    Routes are keyed by channel ID, worked out the first time a channel is seen and refreshed when channels are
+    created, renamed or deleted.
+    """
+
+    def __init__(self, config: dict):
+        channels = config.get("channels", {})
+        self.include = frozenset(channels.get("include", []))
+        self.exclude = frozenset(channels.get("exclude", []))
+        self.voting = frozenset(channels.get("voting", []))
+        self.any_channel_voting_guilds = _parse_guild_ids(
+            config.get("any_channel_voting_guilds", [])
+        )
+        self.routes: dict[int, ChannelRoute] = {}
+
+    def compile(self, channel: discord.abc.Messageable) -> ChannelRoute:
+        name = getattr(channel, "name", None)
+        guild = getattr(channel, "guild", None)
+        return ChannelRoute(
+            voting=isinstance(channel, (discord.TextChannel, discord.Thread))
+            and name in self.voting,
+            any_message_voting=guild is not None
+            and guild.id in self.any_channel_voting_guilds,
+            included=not self.include or name in self.include,
+            excluded=name in self.exclude,
+        )
+
+    def route(self, channel: discord.abc.Messageable) -> ChannelRoute:
+        if route := self.routes.get(channel.id):
+            return route
+        return self.update(channel)
+
+    def update(self, channel: discord.abc.Messageable) -> ChannelRoute:
+        route = self.compile(channel)
+        self.routes[channel.id] = route
+        return route
+
+    def remove(self, channel_id: int):
+        self.routes.pop(channel_id, None)
@@ -0,0 +1,131 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from .models import Reminder
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+PREVIOUS_PAGE = "◀️"
+NEXT_PAGE = "▶️"
+PAGE_EMOJI = (PREVIOUS_PAGE, NEXT_PAGE)
+
+CHANNEL_MENTION = re.compile(r"<#(?P<channel_id>\d+)>")
+HOURS = re.compile(r"(?P<hours>\d+)\s*h(?:ours?|rs?)?\b", re.IGNORECASE)
+MINE = re.compile(r"\b(?:mine|me|my)\b", re.IGNORECASE)
+HERE = re.compile(r"\bhere\b", re.IGNORECASE)
+
+
+@dataclass
+class ScheduleFilter:
+    mine: bool = False
+    channel_id: Optional[int] = None
+    within: Optional[timedelta] = None
+
+    @classmethod
+    def parse(cls, text: Optional[str], current_channel_id: int) -> "ScheduleFilter":
+        """
+        Reads filters like "mine", "#channel", "here" or "6h" from the text after !schedule.
+        """
+        schedule_filter = cls()
+        if not text:
+            return schedule_filter
+        schedule_filter.mine = bool(MINE.search(text))
+        if match := CHANNEL_MENTION.search(text):
+            schedule_filter.channel_id = int(match.group("channel_id"))
+        elif HERE.search(text):
+            schedule_filter.channel_id = current_channel_id
+        if match := HOURS.search(text):
+            schedule_filter.within = timedelta(hours=int(match.group("hours")))
+        return schedule_filter
+
+    @property
+    def active(self) -> bool:
+        return self.mine or self.channel_id is not None or self.within is not None
+
+    def describe(self) -> str:
+        parts = []
+        if self.mine:
+            parts.append("yours")
+        if self.channel_id is not None:
+            parts.append(f"in <#{self.channel_id}>")
+        if self.within is not None:
+            parts.append(f"in the next {self.within.total_seconds() / 3600:g} hours")
+        return ", ".join(parts)
+
+
+def describe_reminder(reminder: Reminder, max_notes_length: int = 100) -> str:
+    notes = reminder.notes.strip()
+    if len(notes) > max_notes_length:
+        notes = notes[: max_notes_length - 1] + "…"
+    advance = " with 15 minute reminder" if reminder.remind_15_minutes_before else ""
+    return (
+        f"- `{notes}` running at {reminder.date.astimezone().strftime('%a %H:%M:%S %Z')}{advance}."
+        f" Ref `{reminder.id}`"
+    )
+
+
+def paginate(
+    lines: list[str], max_lines: int = 15, max_length: int = 1800
+) -> list[list[str]]:
+    """
+    Splits lines into pages short enough to fit in a message.
+    """
+    pages = [[]]
+    length = 0
+    for line in lines:
+        if pages[-1] and (len(pages[-1]) >= max_lines or length + len(line) + 1 > max_length):
+            pages.append([])
+            length = 0
+        pages[-1].append(line)
+        length += len(line) + 1
+    return pages
+
+
+@dataclass
+class _SchedulePage:
+    owner_id: int
+    pages: list[str]
+    index: int
+    shown_at: float
+
+
+class SchedulePages:
+    """
+    Remembers recently sent schedules, so they can be paged through by reacting with ◀️ or ▶️.
+
+    Only the person who asked for a schedule can page through it. Both adding and removing a reaction turn the page,
+    since the bot can't remove other people's reactions in DMs.
+    """
+
+    def __init__(self, max_entries: int = 50, ttl_seconds: float = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.messages: OrderedDict[int, _SchedulePage] = OrderedDict()
+
+    def add(self, message_id: int, owner_id: int, pages: list[str]):
+        if len(pages) < 2:
+            return
+        self.messages[message_id] = _SchedulePage(owner_id, pages, 0, time.monotonic())
+        while len(self.messages) > self.max_entries:
+            self.messages.popitem(last=False)
+
+    def turn(self, message_id: int, user_id: int, emoji: str) -> Optional[str]:
+        """
+        :return: The page to show instead, if the reaction turns the page of a schedule
+        """
+        if not (page := self.messages.get(message_id)) or page.owner_id != user_id:
+            return None
+        if time.monotonic() - page.shown_at > self.ttl_seconds:
+            del self.messages[message_id]
+            return None
+        step = -1 if emoji == PREVIOUS_PAGE else 1
+        page.index = (page.index + step) % len(page.pages)
+        page.shown_at = time.monotonic()
+        self.messages.move_to_end(message_id)
+        return page.pages[page.index]
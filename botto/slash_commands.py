@@ -2,9 +2,7 @@ import logging
 from datetime import datetime
 from typing import Union
 
-import arrow
 import pytz
-from dateutil import parser as dateparser
 import discord
 from discord_slash import SlashCommand, SlashContext, SlashCommandOptionType
 from discord_slash.utils.manage_commands import create_option
@@ -96,8 +94,10 @@ def setup_slash(
     async def yell_at(ctx: SlashContext, person: discord.Member, **kwargs):
         await _yell(ctx, person, **kwargs)
 
-    def _local_times(time_now: datetime = datetime.utcnow()) -> list[datetime]:
-        return [time_now.astimezone(zone) for zone in config["timezones"]]
+    def _local_times(time_now: datetime) -> list[datetime]:
+        return timezones.zones.local_times(
+            (zone.zone for zone in config["timezones"]), time_now
+        )
 
     @slash.slash(
         name="times",
@@ -113,11 +113,13 @@ def setup_slash(
         # guild_ids=[833842753799848016],
     )
     async def send_local_times(ctx: SlashContext, **kwargs):
-        parsed_time = datetime.utcnow()
+        parsed_time = datetime.now(pytz.utc)
         current_time = kwargs.get("current_time")
         if current_time:
             try:
-                parsed_time = dateparser.parse(current_time)
+                parsed_time = reminder_manager.time_parser.parse(
+                    current_time, datetime.now()
+                )
             except ValueError as error:
                 await ctx.send(f"Failed to parse provided time: {error}")
 
@@ -198,7 +200,9 @@ def setup_slash(
     async def unix_time(ctx: SlashContext, timestamp: str):
         try:
             log.debug(f"/unixtime from: {ctx.author} timestamp: {timestamp}")
-            parsed_date = dateparser.parse(timestamp)
+            parsed_date = reminder_manager.time_parser.parse(
+                timestamp, datetime.now()
+            )
         except (ValueError, OverflowError):
             log.error(f"Failed to parse date: {timestamp}", exc_info=True)
             await ctx.send("Sorry, I was unable to parse that time", hidden=True)
@@ -225,7 +229,9 @@ def setup_slash(
     async def time(ctx: SlashContext, timestamp: str):
         try:
             log.debug(f"/time from: {ctx.author} timestamp: {timestamp}")
-            parsed_date = dateparser.parse(timestamp)
+            parsed_date = reminder_manager.time_parser.parse(
+                timestamp, datetime.now()
+            )
         except (ValueError, OverflowError):
             log.error(f"Failed to parse date: {timestamp}", exc_info=True)
             await ctx.send("Sorry, I was unable to parse that time", hidden=True)
@@ -257,7 +263,7 @@ def setup_slash(
             await ctx.send(
                 "Your currently configured timezone is: {timezone_name} (UTC{offset})".format(
                     timezone_name=timezone.name,
-                    offset=arrow.now(timezone.name).format("Z"),
+                    offset=timezones.zones.offset(timezone.name).format(),
                 ),
                 hidden=True,
             )
@@ -283,7 +289,7 @@ def setup_slash(
                 "{person_name}'s currently configured timezone is: {timezone_name} (UTC{offset})".format(
                     person_name=person.display_name,
                     timezone_name=timezone.name,
-                    offset=arrow.now(timezone.name).format("Z"),
+                    offset=timezones.zones.offset(timezone.name).format(),
                 )
             )
         except TlderNotFoundError:
@@ -311,7 +317,7 @@ def setup_slash(
         log.debug(f"/timezones set from {ctx.author} for timezone name {timezone_name}")
         tzinfo: pytz.tzinfo
         try:
-            tzinfo = pytz.timezone(timezone_name)
+            tzinfo = timezones.zones.zone(timezone_name)
         except pytz.UnknownTimeZoneError:
             await ctx.send(
                 f"Sorry, {timezone_name} is not a known TZ DB key", hidden=True
@@ -340,7 +346,7 @@ def setup_slash(
         await ctx.send(
             "Your timezone has been set to: {timezone_name} (UTC{offset})".format(
                 timezone_name=db_timezone.name,
-                offset=arrow.now(db_timezone.name).format("Z"),
+                offset=timezones.zones.offset(db_timezone.name).format(),
             ),
             hidden=True,
         )
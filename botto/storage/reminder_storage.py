@@ -1,15 +1,21 @@
+import asyncio
 import logging
 from typing import AsyncGenerator
 from datetime import datetime
 from typing import Optional, Any
 
+import aiohttp
 from aiohttp import ClientSession
 
-from botto.models import Reminder
+from botto.models import AirTableError, Reminder
 from botto.storage.storage import Storage
 
 log = logging.getLogger(__name__)
 
+# Airtable deletes at most 10 records per request
+DELETE_BATCH_SIZE = 10
+NOT_FOUND_ERRORS = {"NOT_FOUND", "MODEL_ID_NOT_FOUND"}
+
 
 class ReminderStorage(Storage):
     def __init__(self, airtable_base: str, airtable_key: str):
@@ -57,3 +63,38 @@ class ReminderStorage(Storage):
         log.debug(f"Deleting reminders: {reminder_ids}")
         await self._delete(self.reminders_url, list(reminder_ids))
         log.debug(f"Deleted reminders: {reminder_ids}")
+
+    async def _remove_batch(self, reminder_ids: list[str], session: ClientSession) -> list[str]:
+        try:
+            await self._delete(self.reminders_url, reminder_ids, session)
+            return []
+        except AirTableError as error:
+            if len(reminder_ids) == 1:
+                if error.error_type in NOT_FOUND_ERRORS:
+                    return []
+                log.warning(f"Failed to delete reminder {reminder_ids[0]}: {error.error_type}")
+                return reminder_ids
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Retrying one at a time wouldn't help, so leave the whole batch for later
+            log.warning(f"Failed to delete reminders {reminder_ids}", exc_info=True)
+            return reminder_ids
+        # One bad ID fails the whole batch, so find out which it was
+        failed = []
+        for reminder_id in reminder_ids:
+            failed += await self._remove_batch([reminder_id], session)
+        return failed
+
+    async def remove_reminders(self, reminder_ids: list[str]) -> list[str]:
+        """
+        Deletes reminders in as few requests as possible.
+        :return: The IDs that couldn't be deleted. Reminders that had already been deleted don't count.
+        """
+        batches = [
+            reminder_ids[start : start + DELETE_BATCH_SIZE]
+            for start in range(0, len(reminder_ids), DELETE_BATCH_SIZE)
+        ]
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(
+                *(self._remove_batch(batch, session) for batch in batches)
+            )
+        return [reminder_id for failed in results for reminder_id in failed]
@@ -0,0 +1,188 @@
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from botto.models import Reminder
+from botto.reminder_index import reminder_hash
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+
+
+class LocalReminderStore:
+    """
+    Keeps the scheduled reminders in a local SQLite database, indexed by when they're due.
+
+    Airtable remains the source of truth. This copy is reconciled with it on every sync, and lets reminders be
+    rescheduled as soon as the bot restarts rather than after the next crawl of Airtable. Without a path, the
+    database is only kept in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or ":memory:"
+        self.connection = sqlite3.connect(self.path)
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        with self.connection:
+            if version != SCHEMA_VERSION:
+                # It's only a copy, so anything saved in an older layout can be thrown away and reloaded from Airtable
+                self.connection.execute("DROP TABLE IF EXISTS reminders")
+                self.connection.execute("DROP TABLE IF EXISTS requesters")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reminders (
+                    id TEXT PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    notes TEXT NOT NULL,
+                    remind_15_minutes_before INTEGER NOT NULL,
+                    msg_id TEXT,
+                    channel_id TEXT,
+                    due_at REAL NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS reminders_due_at ON reminders (due_at)"
+            )
+            # Airtable doesn't record who asked for a reminder, so it's only known for the ones set through this copy
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS requesters (
+                    id TEXT PRIMARY KEY,
+                    requester_id TEXT NOT NULL
+                )
+                """
+            )
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _to_row(reminder: Reminder, stored_at: float) -> tuple:
+        return (
+            reminder.id,
+            reminder.date.isoformat(),
+            reminder.notes,
+            int(bool(reminder.remind_15_minutes_before)),
+            reminder.msg_id,
+            reminder.channel_id,
+            reminder.date.timestamp(),
+            reminder_hash(reminder),
+            stored_at,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> Reminder:
+        return Reminder(
+            id=row[0],
+            date=datetime.fromisoformat(row[1]),
+            notes=row[2],
+            remind_15_minutes_before=bool(row[3]),
+            msg_id=row[4],
+            channel_id=row[5],
+        )
+
+    def _select(
+        self, where: str = "", params: tuple = (), limit: Optional[int] = None
+    ) -> list[Reminder]:
+        order = "ORDER BY due_at" if limit is None else "ORDER BY due_at LIMIT ?"
+        rows = self.connection.execute(
+            "SELECT id, date, notes, remind_15_minutes_before, msg_id, channel_id FROM reminders "
+            f"{where} {order}",
+            params if limit is None else (*params, limit),
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def get(self, reminder_id: str) -> Optional[Reminder]:
+        if reminders := self._select("WHERE id = ?", (reminder_id,)):
+            return reminders[0]
+        return None
+
+    def due_between(self, start: float, end: float) -> list[Reminder]:
+        """
+        Gets the reminders due from `start` up to (but not including) `end`, as Unix timestamps.
+        """
+        return self._select("WHERE due_at >= ? AND due_at < ?", (start, end))
+
+    def upcoming(self, limit: int = -1) -> list[Reminder]:
+        return self._select(limit=limit)
+
+    def find(
+        self,
+        requester_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        due_before: Optional[float] = None,
+        limit: int = -1,
+    ) -> tuple[list[Reminder], int]:
+        """
+        Finds upcoming reminders, soonest first.
+        :param requester_id: Only include reminders set by, or mentioning, this user
+        :param channel_id: Only include reminders for this channel
+        :param due_before: Only include reminders due before this Unix timestamp
+        :param limit: The most reminders to return
+        :return: The reminders, and how many matched in total
+        """
+        conditions = []
+        params = []
+        if requester_id is not None:
+            conditions.append(
+                "(id IN (SELECT id FROM requesters WHERE requester_id = ?)"
+                " OR instr(notes, ?) OR instr(notes, ?))"
+            )
+            params += [str(requester_id), f"<@{requester_id}>", f"<@!{requester_id}>"]
+        if channel_id is not None:
+            conditions.append("channel_id = ?")
+            params.append(str(channel_id))
+        if due_before is not None:
+            conditions.append("due_at < ?")
+            params.append(due_before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total = self.connection.execute(
+            f"SELECT COUNT(*) FROM reminders {where}", params
+        ).fetchone()[0]
+        return self._select(f"{where}", tuple(params), limit), total
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+    def known(self) -> dict[str, tuple[str, float]]:
+        """
+        Gets the content hash of every stored reminder, and when it was stored, keyed by ID.
+        """
+        return {
+            row[0]: (row[1], row[2])
+            for row in self.connection.execute(
+                "SELECT id, content_hash, stored_at FROM reminders"
+            )
+        }
+
+    def apply(self, upserted: Iterable[Reminder], removed: Iterable[str]):
+        """
+        Saves and removes reminders in a single transaction.
+        """
+        stored_at = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO reminders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._to_row(reminder, stored_at) for reminder in upserted],
+            )
+            removed = [(reminder_id,) for reminder_id in removed]
+            self.connection.executemany("DELETE FROM reminders WHERE id = ?", removed)
+            self.connection.executemany("DELETE FROM requesters WHERE id = ?", removed)
+
+    def put(self, reminder: Reminder, requester_id: Optional[int] = None):
+        self.apply([reminder], [])
+        if requester_id is not None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO requesters VALUES (?, ?)",
+                    (reminder.id, str(requester_id)),
+                )
+
+    def remove(self, *reminder_ids: str):
+        self.apply([], reminder_ids)
+
+    def close(self):
+        self.connection.close()
@@ -102,7 +102,7 @@ class Storage:
                     else base_url + f"/{records_to_delete[0]}"
                 ),
                 params=(
-                    {"records": records_to_delete}
+                    [("records[]", record_id) for record_id in records_to_delete]
                     if len(records_to_delete) > 1
                     else None
                 ),
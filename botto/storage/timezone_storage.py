@@ -1,9 +1,10 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Iterable
 
 from botto.models import TLDer, Timezone
 from botto.storage.storage import Storage
+from botto.zone_registry import ZoneRegistry
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class TimezoneStorage(Storage):
         self.tlders_cache: dict[str, TLDer] = {}
         self.timezones_lock = asyncio.Lock()
         self.timezones_cache: dict[str, Timezone] = {}
+        self.zones = ZoneRegistry()
         self.auth_header = {"Authorization": f"Bearer {self.airtable_key}"}
 
     async def list_tlders(self) -> list[TLDer]:
@@ -76,6 +78,19 @@ class TimezoneStorage(Storage):
             self.timezones_lock.release()
             return await self._retrieve_timezone(key)
 
+    def cached_zones(self, discord_ids: Iterable[int]) -> dict[str, list[TLDer]]:
+        """
+        Groups TLDers by the name of their timezone, using only what's already cached.
+        TLDers that aren't cached, or whose timezone isn't, are left out rather than fetched.
+        """
+        zones: dict[str, list[TLDer]] = {}
+        for discord_id in discord_ids:
+            if not (tlder := self.tlders_cache.get(str(discord_id))):
+                continue
+            if timezone := self.timezones_cache.get(tlder.timezone_id):
+                zones.setdefault(timezone.name, []).append(tlder)
+        return zones
+
     async def update_tlder_timezone_cache(self):
         tlders = await self.list_tlders()
         for tlder in tlders:
@@ -0,0 +1,15 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def loop():
+    """
+    Runs a test on its own event loop, leaving a fresh one current afterwards for code that expects there to be one.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(asyncio.new_event_loop())
@@ -0,0 +1,106 @@
+import asyncio
+
+from botto.debounce import Debouncer
+
+
+def test_coalesces_requests_into_latest_call(loop):
+    async def run():
+        calls = []
+
+        def call(value):
+            async def func():
+                calls.append(value)
+
+            return func
+
+        debouncer = Debouncer(delay=0.05, max_delay=1)
+        for value in range(3):
+            debouncer.schedule("key", call(value))
+            await asyncio.sleep(0.01)
+        debouncer.schedule("other", call("other"))
+        await asyncio.sleep(0.1)
+        assert calls == [2, "other"]
+        assert debouncer.requests == 4
+        assert debouncer.calls == 2
+
+    loop.run_until_complete(run())
+
+
+def test_calls_by_max_delay(loop):
+    async def run():
+        calls = []
+
+        async def func():
+            calls.append(asyncio.get_event_loop().time())
+
+        debouncer = Debouncer(delay=0.05, max_delay=0.12)
+        started = asyncio.get_event_loop().time()
+        for _ in range(10):
+            debouncer.schedule("key", func)
+            await asyncio.sleep(0.03)
+        await asyncio.sleep(0.1)
+        assert len(calls) >= 2
+        assert calls[0] - started < 0.2
+
+    loop.run_until_complete(run())
+
+
+def test_calls_for_same_key_never_overlap(loop):
+    async def run():
+        running = []
+        overlapped = []
+
+        async def func():
+            running.append(True)
+            if len(running) > 1:
+                overlapped.append(True)
+            await asyncio.sleep(0.05)
+            running.pop()
+
+        debouncer = Debouncer(delay=0.01, max_delay=0.01)
+        debouncer.schedule("key", func)
+        await asyncio.sleep(0.02)
+        debouncer.schedule("key", func)
+        await asyncio.sleep(0.15)
+        assert debouncer.calls == 2
+        assert overlapped == []
+        assert debouncer.running == {}
+
+    loop.run_until_complete(run())
+
+
+def test_cancel(loop):
+    async def run():
+        calls = []
+
+        async def func():
+            calls.append(True)
+
+        debouncer = Debouncer(delay=0.02, max_delay=0.02)
+        debouncer.schedule("key", func)
+        debouncer.cancel("key")
+        debouncer.cancel("missing")
+        await asyncio.sleep(0.05)
+        assert calls == []
+
+    loop.run_until_complete(run())
+
+
+def test_failed_call_is_logged(loop):
+    async def run():
+        calls = []
+
+        async def fail():
+            raise RuntimeError("Failed")
+
+        async def func():
+            calls.append(True)
+
+        debouncer = Debouncer(delay=0.01, max_delay=0.01)
+        debouncer.schedule("key", fail)
+        await asyncio.sleep(0.03)
+        debouncer.schedule("key", func)
+        await asyncio.sleep(0.03)
+        assert calls == [True]
+
+    loop.run_until_complete(run())
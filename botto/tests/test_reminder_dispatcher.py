@@ -0,0 +1,236 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from botto.models import Reminder
+from botto.reminder_dispatcher import ADVANCE_NOTICE, ReminderDispatcher
+from botto.storage.reminder_store import LocalReminderStore
+
+
+def make_reminder(
+    reminder_id: str, seconds: float, channel_id: str = "1", advance: bool = False
+) -> Reminder:
+    return Reminder(
+        id=reminder_id,
+        date=datetime.now(timezone.utc) + timedelta(seconds=seconds),
+        notes=f"Reminder {reminder_id}",
+        remind_15_minutes_before=advance,
+        msg_id=None,
+        channel_id=channel_id,
+    )
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self.missed = []
+        self.prepared = []
+
+    async def fire(self, batch: list[tuple[Reminder, bool]]):
+        self.batches.append([(reminder.id, advance) for reminder, advance in batch])
+
+    def miss(self, reminder: Reminder):
+        self.missed.append(reminder.id)
+
+    async def prepare(self, reminder: Reminder, advance: bool):
+        self.prepared.append((reminder.id, advance))
+
+
+def make_dispatcher(recorder: Recorder, **kwargs) -> ReminderDispatcher:
+    return ReminderDispatcher(
+        LocalReminderStore(), fire=recorder.fire, missed=recorder.miss, **kwargs
+    )
+
+
+def test_fires_due_reminders(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder)
+        dispatcher.store.put(make_reminder("first", 0.1, channel_id="1"))
+        dispatcher.store.put(make_reminder("second", 0.2, channel_id="2"))
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        assert recorder.batches == []
+        await asyncio.sleep(0.3)
+        dispatcher.stop()
+        assert recorder.batches == [[("first", False)], [("second", False)]]
+        assert dispatcher.due_soon == {}
+        assert dispatcher.fired == 2
+        assert dispatcher.batches == 2
+        assert dispatcher.sending == set()
+
+    loop.run_until_complete(run())
+
+
+def test_pages_in_reminders_as_they_come_within_horizon(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder, horizon_seconds=0.4)
+        dispatcher.store.put(make_reminder("later", 0.5))
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        assert dispatcher.pages == 1
+        assert "later" not in dispatcher.due_soon
+        await asyncio.sleep(0.6)
+        dispatcher.stop()
+        assert recorder.batches == [[("later", False)]]
+        assert dispatcher.pages > 1
+
+    loop.run_until_complete(run())
+
+
+def test_changed_reminder_only_fires_at_new_time(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder)
+        dispatcher.start()
+        await asyncio.sleep(0)
+        reminder = make_reminder("changed", 0.1)
+        dispatcher.store.put(reminder)
+        dispatcher.add(reminder)
+        reminder = make_reminder("changed", 0.3)
+        dispatcher.store.put(reminder)
+        dispatcher.add(reminder)
+        await asyncio.sleep(0.2)
+        assert recorder.batches == []
+        await asyncio.sleep(0.2)
+        dispatcher.stop()
+        assert recorder.batches == [[("changed", False)]]
+
+    loop.run_until_complete(run())
+
+
+def test_removed_reminder_is_not_fired(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder)
+        dispatcher.store.put(make_reminder("removed", 0.1))
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        dispatcher.remove("removed")
+        await asyncio.sleep(0.1)
+        dispatcher.stop()
+        assert recorder.batches == []
+
+    loop.run_until_complete(run())
+
+
+def test_batches_reminders_for_the_same_channel(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder, batch_seconds=0.2, max_batch=2)
+        for reminder in [
+            make_reminder("a", 0.1),
+            make_reminder("other_channel", 0.12, channel_id="2"),
+            make_reminder("b", 0.15),
+            make_reminder("c", 0.2),
+            make_reminder("too_late", 0.5),
+        ]:
+            dispatcher.store.put(reminder)
+        dispatcher.start()
+        await asyncio.sleep(0.15)
+        # Waiting for the last reminder in the batch to be due
+        assert recorder.batches == [[("other_channel", False)]]
+        await asyncio.sleep(0.5)
+        dispatcher.stop()
+        assert sorted(recorder.batches) == [
+            [("a", False), ("b", False)],
+            [("c", False)],
+            [("other_channel", False)],
+            [("too_late", False)],
+        ]
+
+    loop.run_until_complete(run())
+
+
+def test_sends_advance_notice(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder)
+        advance_seconds = ADVANCE_NOTICE.total_seconds()
+        dispatcher.store.put(make_reminder("advance", advance_seconds + 0.1, advance=True))
+        dispatcher.start()
+        await asyncio.sleep(0.2)
+        dispatcher.stop()
+        assert recorder.batches == [[("advance", True)]]
+        assert "advance" in dispatcher.due_soon
+
+    loop.run_until_complete(run())
+
+
+def test_restored_reminders_get_grace_period(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder, misfire_grace_seconds=300)
+        dispatcher.store.put(make_reminder("late", -60))
+        dispatcher.store.put(make_reminder("too_late", -600))
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        dispatcher.stop()
+        assert recorder.batches == [[("late", False)]]
+        assert recorder.missed == ["too_late"]
+        assert dispatcher.missed_count == 1
+
+    loop.run_until_complete(run())
+
+
+def test_reminders_added_late_are_missed(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(recorder, misfire_grace_seconds=300)
+        dispatcher.start()
+        await asyncio.sleep(0)
+        late = make_reminder("late", -1)
+        dispatcher.store.put(late)
+        dispatcher.add(late)
+        # Only the advance notice is already due
+        advance_late = make_reminder("advance_late", 60, advance=True)
+        dispatcher.store.put(advance_late)
+        dispatcher.add(advance_late)
+        await asyncio.sleep(0.05)
+        dispatcher.stop()
+        assert recorder.batches == []
+        assert recorder.missed == ["late"]
+        assert "late" not in dispatcher.due_soon
+        assert "advance_late" in dispatcher.due_soon
+
+    loop.run_until_complete(run())
+
+
+def test_prepares_reminders_before_firing(loop):
+    async def run():
+        recorder = Recorder()
+        dispatcher = make_dispatcher(
+            recorder, prepare=recorder.prepare, prepare_seconds=0.2
+        )
+        dispatcher.store.put(make_reminder("prepared", 0.3))
+        dispatcher.start()
+        await asyncio.sleep(0.15)
+        assert recorder.prepared == [("prepared", False)]
+        assert recorder.batches == []
+        await asyncio.sleep(0.25)
+        dispatcher.stop()
+        assert recorder.batches == [[("prepared", False)]]
+        assert recorder.prepared == [("prepared", False)]
+
+    loop.run_until_complete(run())
+
+
+def test_failed_fire_does_not_stop_dispatcher(loop):
+    async def run():
+        fired = []
+
+        async def fire(batch):
+            fired.extend(reminder.id for reminder, _ in batch)
+            raise RuntimeError("Discord is down")
+
+        dispatcher = ReminderDispatcher(
+            LocalReminderStore(), fire=fire, missed=lambda reminder: None
+        )
+        dispatcher.store.put(make_reminder("first", 0.05))
+        dispatcher.store.put(make_reminder("second", 0.1, channel_id="2"))
+        dispatcher.start()
+        await asyncio.sleep(0.2)
+        dispatcher.stop()
+        assert fired == ["first", "second"]
+
+    loop.run_until_complete(run())
@@ -0,0 +1,70 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from botto.models import Reminder
+from botto.reminder_index import diff_reminders, reminder_hash
+
+
+def make_reminder(reminder_id: str, **changes) -> Reminder:
+    reminder = Reminder(
+        id=reminder_id,
+        date=datetime(2021, 10, 4, 12, 0, tzinfo=timezone.utc),
+        notes="Take the bins out",
+        remind_15_minutes_before=False,
+        msg_id="123",
+        channel_id="456",
+    )
+    return replace(reminder, **changes)
+
+
+def test_hash_covers_everything_scheduled():
+    reminder = make_reminder("rec1")
+    assert reminder_hash(reminder) == reminder_hash(make_reminder("rec1"))
+    assert reminder_hash(reminder) == reminder_hash(make_reminder("rec2"))
+    for changes in [
+        {"date": datetime(2021, 10, 4, 12, 1, tzinfo=timezone.utc)},
+        {"notes": "Take the recycling out"},
+        {"remind_15_minutes_before": True},
+        {"msg_id": None},
+        {"channel_id": "789"},
+    ]:
+        assert reminder_hash(reminder) != reminder_hash(make_reminder("rec1", **changes))
+
+
+def test_diff():
+    unchanged = make_reminder("unchanged")
+    modified = make_reminder("modified")
+    removed = make_reminder("removed")
+    known = {
+        reminder.id: (reminder_hash(reminder), 100.0)
+        for reminder in [unchanged, modified, removed]
+    }
+    added = make_reminder("added")
+    modified = replace(modified, notes="Something else")
+
+    diff = diff_reminders(known, [unchanged, modified, added], listed_at=200.0)
+    assert diff.added == [added]
+    assert diff.modified == [modified]
+    assert diff.removed == ["removed"]
+    assert diff.unchanged == 1
+    assert str(diff) == "1 added, 1 modified, 1 removed, 1 unchanged"
+
+
+def test_diff_keeps_reminders_stored_during_listing():
+    reminder = make_reminder("rec1")
+    diff = diff_reminders({"rec1": (reminder_hash(reminder), 300.0)}, [], listed_at=200.0)
+    assert diff.removed == []
+
+
+def test_diff_skips_reminders_forgotten_during_listing():
+    reminder = make_reminder("rec1")
+    diff = diff_reminders({}, [reminder], listed_at=200.0, forgotten={"rec1": 250.0})
+    assert diff.added == []
+    # Forgotten before the listing started, so it's really still in storage
+    diff = diff_reminders({}, [reminder], listed_at=200.0, forgotten={"rec1": 150.0})
+    assert diff.added == [reminder]
+    # Scheduled again since it was forgotten
+    known = {"rec1": (reminder_hash(reminder), 260.0)}
+    changed = replace(reminder, notes="Changed")
+    diff = diff_reminders(known, [changed], listed_at=200.0, forgotten={"rec1": 250.0})
+    assert diff.modified == [changed]
@@ -0,0 +1,111 @@
+import asyncio
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from botto.models import AirTableError
+from botto.storage import storage
+from botto.storage.reminder_storage import ReminderStorage
+
+
+def airtable_error(error_type: str) -> AirTableError:
+    return AirTableError(
+        URL("https://api.airtable.com"), {"error": {"type": error_type}}
+    )
+
+
+class FakeDeletes:
+    """
+    Stands in for ReminderStorage._delete, failing for the IDs it's told to.
+    """
+
+    def __init__(self, errors: dict[str, Exception] = None):
+        self.errors = errors or {}
+        self.requests = []
+
+    async def __call__(self, url: str, reminder_ids: list[str], session=None):
+        self.requests.append(list(reminder_ids))
+        await asyncio.sleep(0)
+        for reminder_id in reminder_ids:
+            if error := self.errors.get(reminder_id):
+                raise error
+
+
+def remove_reminders(loop, errors: dict[str, Exception], reminder_ids: list[str]):
+    reminder_storage = ReminderStorage("fake_base", "fake_key")
+    deletes = FakeDeletes(errors)
+    reminder_storage._delete = deletes
+    failed = loop.run_until_complete(reminder_storage.remove_reminders(reminder_ids))
+    return failed, deletes.requests
+
+
+def test_deletes_in_batches_of_ten(loop):
+    ids = [f"rec{number}" for number in range(25)]
+    failed, requests = remove_reminders(loop, {}, ids)
+    assert failed == []
+    assert requests == [ids[0:10], ids[10:20], ids[20:25]]
+
+
+def test_failed_batch_is_retried_one_at_a_time(loop):
+    ids = [f"rec{number}" for number in range(12)]
+    errors = {
+        "rec3": airtable_error("INVALID_PERMISSIONS"),
+        "rec4": airtable_error("NOT_FOUND"),
+    }
+    failed, requests = remove_reminders(loop, errors, ids)
+    # Already deleted counts as done
+    assert failed == ["rec3"]
+    retries = [[reminder_id] for reminder_id in ids[0:10]]
+    assert requests == [ids[0:10], ids[10:12]] + retries
+
+
+@pytest.mark.parametrize(
+    "error", [aiohttp.ClientConnectionError(), asyncio.TimeoutError()]
+)
+def test_network_errors_keep_whole_batch(loop, error):
+    ids = [f"rec{number}" for number in range(12)]
+    failed, requests = remove_reminders(loop, {"rec11": error}, ids)
+    assert failed == ids[10:12]
+    assert requests == [ids[0:10], ids[10:12]]
+
+
+def test_nothing_to_delete(loop):
+    assert remove_reminders(loop, {}, []) == ([], [])
+
+
+class FakeResponse:
+    status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    def delete(self, url, params=None, headers=None):
+        self.requests.append((url, params))
+        return FakeResponse()
+
+
+def test_delete_sends_multiple_records_as_a_list(loop, monkeypatch):
+    async def no_sleep():
+        pass
+
+    monkeypatch.setattr(storage, "airtable_sleep", no_sleep)
+    reminder_storage = ReminderStorage("fake_base", "fake_key")
+    session = FakeSession()
+    url = reminder_storage.reminders_url
+    loop.run_until_complete(
+        reminder_storage._delete(url, ["rec1", "rec2"], session)
+    )
+    loop.run_until_complete(reminder_storage._delete(url, ["rec3"], session))
+    assert session.requests == [
+        (url, [("records[]", "rec1"), ("records[]", "rec2")]),
+        (f"{url}/rec3", None),
+    ]
@@ -0,0 +1,118 @@
+import sqlite3
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from botto.models import Reminder
+from botto.reminder_index import reminder_hash
+from botto.storage.reminder_store import SCHEMA_VERSION, LocalReminderStore
+
+START = datetime(2021, 10, 4, 12, 0, tzinfo=timezone.utc)
+
+
+def make_reminder(reminder_id: str, minutes: int, **changes) -> Reminder:
+    reminder = Reminder(
+        id=reminder_id,
+        date=START + timedelta(minutes=minutes),
+        notes=f"Reminder {reminder_id}",
+        remind_15_minutes_before=False,
+        msg_id="123",
+        channel_id="456",
+    )
+    return replace(reminder, **changes)
+
+
+def test_round_trip():
+    store = LocalReminderStore()
+    reminder = make_reminder(
+        "rec1",
+        0,
+        date=datetime(2021, 10, 4, 13, 0, tzinfo=timezone(timedelta(hours=1))),
+        remind_15_minutes_before=True,
+        msg_id=None,
+        channel_id=None,
+    )
+    store.put(reminder)
+    assert store.get("rec1") == reminder
+    assert store.get("missing") is None
+    assert store.count() == 1
+
+
+def test_due_between_and_upcoming():
+    store = LocalReminderStore()
+    store.apply([make_reminder(f"rec{minutes}", minutes) for minutes in (30, 0, 10, 20)], [])
+    start = START.timestamp()
+    assert [r.id for r in store.due_between(start, start + 1200)] == ["rec0", "rec10"]
+    assert [r.id for r in store.due_between(start + 1, start + 1201)] == ["rec10", "rec20"]
+    assert [r.id for r in store.upcoming()] == ["rec0", "rec10", "rec20", "rec30"]
+    assert [r.id for r in store.upcoming(2)] == ["rec0", "rec10"]
+
+
+def test_find():
+    store = LocalReminderStore()
+    store.put(make_reminder("set_by", 0), requester_id=1)
+    store.put(make_reminder("mentions", 10, notes="For <@1>"))
+    store.put(make_reminder("nickname", 20, notes="For <@!1>", channel_id="789"))
+    store.put(make_reminder("other", 30, notes="For <@11>"), requester_id=2)
+
+    assert store.find() == (store.upcoming(), 4)
+    reminders, total = store.find(requester_id=1)
+    assert [r.id for r in reminders] == ["set_by", "mentions", "nickname"]
+    assert total == 3
+    reminders, total = store.find(requester_id=1, limit=1)
+    assert [r.id for r in reminders] == ["set_by"]
+    assert total == 3
+    reminders, total = store.find(requester_id=1, channel_id=789)
+    assert [r.id for r in reminders] == ["nickname"]
+    reminders, total = store.find(due_before=(START + timedelta(minutes=10)).timestamp())
+    assert [r.id for r in reminders] == ["set_by"]
+    assert store.find(requester_id=3) == ([], 0)
+
+
+def test_known_and_apply():
+    store = LocalReminderStore()
+    first = make_reminder("rec1", 0)
+    store.put(first, requester_id=1)
+    store.put(make_reminder("rec2", 10))
+    known = store.known()
+    assert set(known) == {"rec1", "rec2"}
+    assert known["rec1"][0] == reminder_hash(first)
+
+    changed = replace(first, notes="Changed")
+    store.apply([changed], ["rec2"])
+    assert store.upcoming() == [changed]
+    assert store.known()["rec1"][0] == reminder_hash(changed)
+    assert store.known()["rec1"][1] >= known["rec1"][1]
+
+    store.remove("rec1")
+    assert store.count() == 0
+    # Removing a reminder forgets who set it
+    store.put(first)
+    assert store.find(requester_id=1) == ([], 0)
+
+
+def test_kept_between_restarts(tmp_path):
+    path = str(tmp_path / "reminders.db")
+    store = LocalReminderStore(path)
+    store.put(make_reminder("rec1", 0), requester_id=1)
+    store.close()
+
+    store = LocalReminderStore(path)
+    assert store.path == path
+    assert [r.id for r in store.find(requester_id=1)[0]] == ["rec1"]
+
+
+def test_older_schema_is_replaced(tmp_path):
+    path = str(tmp_path / "reminders.db")
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE reminders (id TEXT PRIMARY KEY, date TEXT)")
+        connection.execute("INSERT INTO reminders VALUES ('old', '2021-10-04')")
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    connection.close()
+
+    store = LocalReminderStore(path)
+    assert store.count() == 0
+    store.put(make_reminder("rec1", 0))
+    assert store.count() == 1
+    version = store.connection.execute("PRAGMA user_version").fetchone()[0]
+    assert version == SCHEMA_VERSION
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import dateutil.parser
+import pytest
+
+from botto.reminder_time_parser import ReminderTimeParser
+
+CORPUS = Path(__file__).parents[2] / "benchmarks" / "corpus" / "reminder_times.txt"
+# A Monday
+NOW = datetime(2021, 10, 4, 10, 15)
+
+
+def corpus_times() -> list[str]:
+    return [line.strip() for line in CORPUS.read_text().splitlines() if line.strip()]
+
+
+def test_fast_path_matches_dateutil():
+    parser = ReminderTimeParser()
+    fast = 0
+    for text in corpus_times():
+        parsed = parser._parse_fast(text, NOW)
+        if parsed is None:
+            continue
+        try:
+            expected = dateutil.parser.parse(text, default=NOW.replace(hour=0, minute=0))
+        except (ValueError, OverflowError):
+            # dateutil doesn't understand relative days like "tomorrow 9am"
+            continue
+        fast += 1
+        assert parsed == expected, text
+        assert parsed.utcoffset() == expected.utcoffset(), text
+    assert fast
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("2021-10-05", datetime(2021, 10, 5)),
+        ("2021-10-05T09:30", datetime(2021, 10, 5, 9, 30)),
+        ("2021-10-05 9:30:15", datetime(2021, 10, 5, 9, 30, 15)),
+        ("2021-10-05T09:30Z", datetime(2021, 10, 5, 9, 30, tzinfo=timezone.utc)),
+        (
+            "2021-10-05T09:30+0530",
+            datetime(2021, 10, 5, 9, 30, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        ),
+        ("14:30", datetime(2021, 10, 4, 14, 30)),
+        ("9am", datetime(2021, 10, 4, 9, 0)),
+        ("12am", datetime(2021, 10, 4, 0, 0)),
+        ("7:45 PM", datetime(2021, 10, 4, 19, 45)),
+        ("tomorrow 9am", datetime(2021, 10, 5, 9, 0)),
+        ("9am tomorrow", datetime(2021, 10, 5, 9, 0)),
+        ("today at 17:00", datetime(2021, 10, 4, 17, 0)),
+        ("Friday, 8pm", datetime(2021, 10, 8, 20, 0)),
+        ("mon 08:00", datetime(2021, 10, 4, 8, 0)),
+        ("sunday 08:00", datetime(2021, 10, 10, 8, 0)),
+    ],
+)
+def test_parse_fast(text, expected):
+    parser = ReminderTimeParser()
+    assert parser.parse(text, NOW) == expected
+    assert parser.fast == 1
+    assert parser.fallback == 0
+
+
+@pytest.mark.parametrize(
+    "text", ["9", "13pm", "24:00", "9:60", "tomorrow 9am friday", "2021-02-30"]
+)
+def test_not_fast(text):
+    assert ReminderTimeParser()._parse_fast(text, NOW) is None
+
+
+def test_falls_back_to_dateutil():
+    parser = ReminderTimeParser()
+    assert parser.parse("October 5th 2021 at 3pm", NOW) == datetime(2021, 10, 5, 15, 0)
+    assert parser.fallback == 1
+    with pytest.raises(ValueError):
+        parser.parse("whenever", NOW)
+    assert parser.hit_rate == 0.0
+
+
+def test_hit_rate():
+    parser = ReminderTimeParser()
+    assert parser.hit_rate == 0.0
+    parser.parse("9am", NOW)
+    parser.parse("10am", NOW)
+    parser.parse("October 5th", NOW)
+    assert parser.hit_rate == pytest.approx(2 / 3)
+    assert "2 fast, 1 fell back" in parser.stats()
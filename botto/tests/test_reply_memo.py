@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from botto import reply_memo
+from botto.reply_memo import ReplyMemo
+
+EIGHT_PM = datetime(2021, 10, 4, 20, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(reply_memo, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_suppresses_repeated_conversions(clock):
+    memo = ReplyMemo()
+    assert memo.filter(1, 10, [("8pm", EIGHT_PM)]) == [("8pm", EIGHT_PM)]
+    # The same instant, however it was written
+    assert memo.filter(1, 10, [("20:00", EIGHT_PM)]) == []
+    nine_pm = EIGHT_PM + timedelta(hours=1)
+    assert memo.filter(1, 10, [("20:00", EIGHT_PM), ("9pm", nine_pm)]) == [("9pm", nine_pm)]
+    # Someone else, or somewhere else
+    assert memo.filter(1, 11, [("8pm", EIGHT_PM)]) == [("8pm", EIGHT_PM)]
+    assert memo.filter(2, 10, [("8pm", EIGHT_PM)]) == [("8pm", EIGHT_PM)]
+    assert memo.posted == 4
+    assert memo.suppressed == 2
+    assert memo.stats() == "Time conversions: 4 posted, 2 suppressed as repeats"
+
+
+def test_conversions_expire(clock):
+    memo = ReplyMemo(ttl_seconds=300)
+    memo.filter(1, 10, [("8pm", EIGHT_PM)])
+    clock.now = 299
+    assert memo.filter(1, 10, [("8pm", EIGHT_PM)]) == []
+    clock.now = 301
+    assert memo.filter(1, 10, [("8pm", EIGHT_PM)]) == [("8pm", EIGHT_PM)]
+
+
+def test_oldest_conversions_are_dropped(clock):
+    memo = ReplyMemo(max_entries=2)
+    times = [EIGHT_PM + timedelta(minutes=minutes) for minutes in range(3)]
+    memo.filter(1, 10, [("time", instant) for instant in times])
+    assert memo.filter(1, 10, [("time", times[0])]) == [("time", times[0])]
+    assert memo.filter(1, 10, [("time", times[2])]) == []
+
+
+def test_forget_channel(clock):
+    memo = ReplyMemo()
+    memo.filter(1, 10, [("8pm", EIGHT_PM)])
+    memo.forget_channel(1)
+    memo.forget_channel(2)
+    assert memo.filter(1, 10, [("8pm", EIGHT_PM)]) == [("8pm", EIGHT_PM)]
+    assert memo.filter(3, 10, []) == []
+    assert 3 not in memo.channels
+
+
+def test_forget_conversions_that_werent_posted(clock):
+    memo = ReplyMemo()
+    nine_pm = EIGHT_PM + timedelta(hours=1)
+    memo.filter(1, 10, [("8pm", EIGHT_PM)])
+    fresh = memo.filter(1, 10, [("8pm", EIGHT_PM), ("9pm", nine_pm)])
+    memo.forget(1, 10, fresh)
+    memo.forget(2, 10, fresh)
+    assert memo.posted == 1
+    assert memo.filter(1, 10, [("9pm", nine_pm)]) == [("9pm", nine_pm)]
+    assert memo.filter(1, 10, [("8pm", EIGHT_PM)]) == []
+
+    memo.forget(1, 10, [("8pm", EIGHT_PM), ("9pm", nine_pm)])
+    assert 1 not in memo.channels
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from botto import schedule_view
+from botto.models import Reminder
+from botto.schedule_view import (
+    NEXT_PAGE,
+    PREVIOUS_PAGE,
+    ScheduleFilter,
+    SchedulePages,
+    describe_reminder,
+    paginate,
+)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (None, ScheduleFilter()),
+        ("", ScheduleFilter()),
+        ("mine", ScheduleFilter(mine=True)),
+        ("My reminders", ScheduleFilter(mine=True)),
+        ("<#123>", ScheduleFilter(channel_id=123)),
+        ("here", ScheduleFilter(channel_id=99)),
+        ("<#123> not here", ScheduleFilter(channel_id=123)),
+        ("6h", ScheduleFilter(within=timedelta(hours=6))),
+        ("mine here 12 hours", ScheduleFilter(True, 99, timedelta(hours=12))),
+        ("theme", ScheduleFilter()),
+    ],
+)
+def test_parse_filter(text, expected):
+    assert ScheduleFilter.parse(text, current_channel_id=99) == expected
+
+
+def test_describe_filter():
+    assert not ScheduleFilter().active
+    schedule_filter = ScheduleFilter(True, 123, timedelta(hours=1.5))
+    assert schedule_filter.active
+    assert schedule_filter.describe() == "yours, in <#123>, in the next 1.5 hours"
+
+
+def test_describe_reminder():
+    reminder = Reminder(
+        id="rec1",
+        date=datetime(2021, 10, 4, 12, 0, tzinfo=timezone.utc),
+        notes="  " + "x" * 150,
+        remind_15_minutes_before=True,
+        msg_id=None,
+        channel_id=None,
+    )
+    description = describe_reminder(reminder)
+    assert description.startswith(f"- `{'x' * 99}…` running at ")
+    assert description.endswith(" with 15 minute reminder. Ref `rec1`")
+
+
+def test_paginate():
+    assert paginate([]) == [[]]
+    lines = [f"line {number}" for number in range(5)]
+    assert paginate(lines, max_lines=2) == [lines[0:2], lines[2:4], lines[4:5]]
+    # Each line takes its length plus a newline
+    assert paginate(["a" * 9, "b" * 9, "c"], max_length=20) == [["a" * 9, "b" * 9], ["c"]]
+    assert paginate(["a" * 50], max_length=20) == [["a" * 50]]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(schedule_view, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_turn_pages(clock):
+    pages = SchedulePages()
+    pages.add(1, owner_id=10, pages=["one"])
+    assert pages.turn(1, 10, NEXT_PAGE) is None
+
+    pages.add(2, owner_id=10, pages=["one", "two", "three"])
+    assert pages.turn(2, 11, NEXT_PAGE) is None
+    assert pages.turn(2, 10, NEXT_PAGE) == "two"
+    assert pages.turn(2, 10, NEXT_PAGE) == "three"
+    assert pages.turn(2, 10, NEXT_PAGE) == "one"
+    assert pages.turn(2, 10, PREVIOUS_PAGE) == "three"
+    assert pages.turn(3, 10, NEXT_PAGE) is None
+
+
+def test_pages_expire(clock):
+    pages = SchedulePages(ttl_seconds=60)
+    pages.add(1, owner_id=10, pages=["one", "two"])
+    clock.now = 50
+    assert pages.turn(1, 10, NEXT_PAGE) == "two"
+    # Turning a page keeps it around for longer
+    clock.now = 100
+    assert pages.turn(1, 10, NEXT_PAGE) == "one"
+    clock.now = 200
+    assert pages.turn(1, 10, NEXT_PAGE) is None
+    assert 1 not in pages.messages
+
+
+def test_oldest_pages_are_dropped(clock):
+    pages = SchedulePages(max_entries=2)
+    for message_id in range(3):
+        pages.add(message_id, owner_id=10, pages=["one", "two"])
+    assert list(pages.messages) == [1, 2]
+    pages.turn(1, 10, NEXT_PAGE)
+    pages.add(3, owner_id=10, pages=["one", "two"])
+    assert list(pages.messages) == [1, 3]
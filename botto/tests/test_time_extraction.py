@@ -0,0 +1,84 @@
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from botto.time_extraction import TimeMention, extract_times, localise_times
+from botto.zone_registry import ZoneRegistry
+
+CORPUS = Path(__file__).parents[2] / "benchmarks" / "corpus" / "messages.txt"
+
+# The regex extract_times replaced
+CONVERT_TIME = re.compile(
+    r"(?:^|[\s\-–—])(?P<time>(?P<hours>[0-2]?[0-9])(?P<minutes>:\d\d)?\s?(?P<am_pm>AM|PM)?(?:\s?\+\d\d?(?::\d\d)?(?::\d\d)?)?)",
+    re.IGNORECASE,
+)
+
+
+def regex_times(content: str) -> tuple[TimeMention, ...]:
+    mentions = []
+    for match in CONVERT_TIME.finditer(content):
+        if not (match.group("minutes") or match.group("am_pm")):
+            continue
+        minutes = match.group("minutes")
+        mentions.append(
+            TimeMention(
+                text=match.group(0),
+                hours=int(match.group("hours")),
+                minutes=int(minutes[1:]) if minutes else 0,
+                am_pm=match.group("am_pm"),
+            )
+        )
+    return tuple(mentions)
+
+
+def test_matches_regex_over_corpus():
+    for content in CORPUS.read_text(encoding="utf-8").splitlines():
+        assert extract_times(content) == regex_times(content), content
+
+
+def test_matches_regex_over_random_messages():
+    rng = random.Random(0)
+    alphabet = "0123456789::  \t\n-–—+aApPmMx.٣"
+    for _ in range(20000):
+        content = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        assert extract_times(content) == regex_times(content), content
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        ("no times here", ()),
+        ("meet at 8pm", (TimeMention(" 8pm", 8, 0, "pm"),)),
+        ("17:30", (TimeMention("17:30", 17, 30),)),
+        ("at 9:15 AM +1", (TimeMention(" 9:15 AM +1", 9, 15, "AM"),)),
+        ("costs 15 pounds", ()),
+        ("from 9am-5pm", (TimeMention(" 9am", 9, 0, "am"), TimeMention("-5pm", 5, 0, "pm"))),
+        ("version1:30", ()),
+    ],
+)
+def test_extract_times(content, expected):
+    assert extract_times(content) == expected
+
+
+def test_hours_24():
+    assert TimeMention("12am", 12, 0, "am").hours_24 == 0
+    assert TimeMention("12pm", 12, 0, "pm").hours_24 == 12
+    assert TimeMention("8PM", 8, 0, "PM").hours_24 == 20
+    assert TimeMention("08:00", 8, 0).hours_24 == 8
+
+
+def test_localise_times():
+    now = datetime(2021, 7, 1, 12, 0, tzinfo=timezone.utc)
+    mentions = extract_times("13:00, 2am, 7am and 29:00")
+    localised = localise_times(
+        mentions, ZoneRegistry(), "Europe/London", now, timedelta(hours=6)
+    )
+    assert [(mention.text, instant) for mention, instant in localised] == [
+        ("13:00", datetime(2021, 7, 1, 12, 0, tzinfo=timezone.utc)),
+        # Far enough in the past to mean tomorrow
+        (" 2am", datetime(2021, 7, 2, 1, 0, tzinfo=timezone.utc)),
+        (" 7am", datetime(2021, 7, 1, 6, 0, tzinfo=timezone.utc)),
+    ]
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+from botto.vote_tally import FINISHED_EMOJI, VoteState, VoteTally
+
+OWN_ID = 1
+VOTE_EMOJI = ["👍", "👎"]
+
+
+def make_reaction(emoji: str, user_ids: list[int], fetches: list[str], me: bool = False):
+    async def flatten():
+        fetches.append(emoji)
+        await asyncio.sleep(0)
+        return [SimpleNamespace(id=user_id) for user_id in user_ids]
+
+    return SimpleNamespace(
+        emoji=emoji, me=me, users=lambda: SimpleNamespace(flatten=flatten)
+    )
+
+
+def make_message(message_id: int, fetches: list[str]):
+    return SimpleNamespace(
+        id=message_id,
+        reactions=[
+            make_reaction("👍", [OWN_ID, 2, 3], fetches, me=True),
+            make_reaction("👎", [3, 4], fetches),
+            make_reaction("🎉", [5], fetches),
+            make_reaction(FINISHED_EMOJI, [OWN_ID], fetches, me=True),
+        ],
+    )
+
+
+def test_vote_state():
+    state = VoteState()
+    state.add("👍", 2)
+    state.add("👎", 2)
+    state.add("👍", 3)
+    assert state.voter_count == 2
+    assert state.flag_change(2) is True
+    state.flagged = True
+    assert state.flag_change(2) is None
+    state.remove("👍", 3)
+    state.remove("🎉", 3)
+    assert state.voter_count == 1
+    assert state.flag_change(2) is False
+
+
+def test_seeds_from_reactions(loop):
+    async def run():
+        fetches = []
+        tally = VoteTally()
+        state = await tally.get_or_seed(make_message(100, fetches), OWN_ID, VOTE_EMOJI)
+        assert state.votes == {"👍": {2, 3}, "👎": {3, 4}}
+        assert state.flagged
+        assert state.voter_count == 3
+        assert fetches == ["👍", "👎"]
+        assert tally.get(100) is state
+
+    loop.run_until_complete(run())
+
+
+def test_concurrent_events_seed_once(loop):
+    async def run():
+        fetches = []
+        tally = VoteTally()
+        message = make_message(100, fetches)
+        states = await asyncio.gather(
+            *(tally.get_or_seed(message, OWN_ID, VOTE_EMOJI) for _ in range(5))
+        )
+        assert all(state is states[0] for state in states)
+        assert fetches == ["👍", "👎"]
+        assert tally.seeding == {}
+
+        await tally.get_or_seed(message, OWN_ID, VOTE_EMOJI)
+        assert fetches == ["👍", "👎"]
+
+    loop.run_until_complete(run())
+
+
+def test_least_recently_used_messages_are_dropped(loop):
+    async def run():
+        tally = VoteTally(max_messages=2)
+        for message_id in range(3):
+            await tally.get_or_seed(make_message(message_id, []), OWN_ID, VOTE_EMOJI)
+        assert tally.get(0) is None
+        tally.get(1)
+        await tally.get_or_seed(make_message(3, []), OWN_ID, VOTE_EMOJI)
+        assert list(tally.states) == [1, 3]
+        tally.forget(1, 4)
+        assert list(tally.states) == [3]
+
+    loop.run_until_complete(run())
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytz
+
+from botto.zone_registry import ZoneOffset, ZoneRegistry
+
+ZONES = ["Europe/London", "America/New_York", "Australia/Lord_Howe", "Asia/Kolkata"]
+
+
+def instants_over_next_year(step: timedelta = timedelta(hours=11)):
+    instant = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = instant + timedelta(days=366)
+    while instant < end:
+        yield instant
+        instant += step
+
+
+@pytest.mark.parametrize("name", ZONES)
+def test_local_time_matches_pytz(name):
+    zones = ZoneRegistry()
+    zone = pytz.timezone(name)
+    for instant in instants_over_next_year():
+        expected = instant.astimezone(zone)
+        actual = zones.local_time(name, instant)
+        assert actual.replace(tzinfo=None) == expected.replace(tzinfo=None)
+        assert actual.utcoffset() == expected.utcoffset()
+        assert actual.tzname() == expected.tzname()
+
+
+@pytest.mark.parametrize("name", ZONES)
+def test_to_utc_matches_pytz(name):
+    zones = ZoneRegistry()
+    zone = pytz.timezone(name)
+    for instant in instants_over_next_year():
+        wall = instant.replace(tzinfo=None)
+        try:
+            expected = zone.localize(wall, is_dst=None)
+        except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError):
+            candidates = {zone.localize(wall, is_dst=is_dst) for is_dst in (False, True)}
+            assert zones.to_utc(name, wall) in candidates
+            continue
+        assert zones.to_utc(name, wall) == expected
+
+
+def test_to_utc_either_side_of_transition():
+    zones = ZoneRegistry()
+    assert zones.to_utc("Europe/London", datetime(2021, 3, 28, 0, 30)) == datetime(
+        2021, 3, 28, 0, 30, tzinfo=timezone.utc
+    )
+    assert zones.to_utc("Europe/London", datetime(2021, 3, 28, 2, 30)) == datetime(
+        2021, 3, 28, 1, 30, tzinfo=timezone.utc
+    )
+
+
+def test_offset_is_cached_until_transition():
+    zones = ZoneRegistry()
+    instant = datetime(2021, 6, 1, tzinfo=timezone.utc)
+    offset = zones.offset("Europe/London", instant)
+    assert offset.offset == timedelta(hours=1)
+    assert offset.abbreviation == "BST"
+    assert offset.valid_from == datetime(2021, 3, 28, 1, tzinfo=timezone.utc)
+    assert offset.valid_until == datetime(2021, 10, 31, 1, tzinfo=timezone.utc)
+
+    zones.offset("Europe/London", instant + timedelta(days=30))
+    zones.local_times(["Europe/London", "Europe/London"], instant)
+    assert zones.resolutions == 1
+
+    later = zones.offset("Europe/London", datetime(2021, 11, 1, tzinfo=timezone.utc))
+    assert later.abbreviation == "GMT"
+    assert zones.resolutions == 2
+
+
+def test_other_periods_dont_evict_current_one():
+    zones = ZoneRegistry()
+    current = zones.offset("Europe/London")
+    zones.offset("Europe/London", current.valid_until + timedelta(days=1))
+    zones.offset("Europe/London", current.valid_from - timedelta(days=1))
+    for _ in range(5):
+        zones.local_time("Europe/London")
+    assert zones.offset("Europe/London") is current
+    assert zones.resolutions == 3
+
+    # Only the periods closest to now are kept
+    far_future = zones.offset("Europe/London", current.valid_until + timedelta(days=400))
+    assert len(zones.offsets["Europe/London"]) == 3
+    assert far_future not in zones.offsets["Europe/London"]
+    assert zones.offset("Europe/London") is current
+    assert zones.resolutions == 4
+
+
+def test_zone_without_transitions():
+    zones = ZoneRegistry()
+    offset = zones.offset("Asia/Kolkata", datetime(2021, 6, 1, tzinfo=timezone.utc))
+    assert offset.offset == timedelta(hours=5, minutes=30)
+    assert offset.covers(datetime(2021, 12, 1, tzinfo=timezone.utc))
+
+
+def test_unknown_zone():
+    with pytest.raises(pytz.UnknownTimeZoneError):
+        ZoneRegistry().zone("Not/A_Zone")
+
+
+@pytest.mark.parametrize(
+    "offset,formatted",
+    [
+        (timedelta(0), "+0000"),
+        (timedelta(hours=1), "+0100"),
+        (timedelta(hours=5, minutes=30), "+0530"),
+        (timedelta(hours=-3, minutes=-30), "-0330"),
+        (timedelta(hours=-10), "-1000"),
+    ],
+)
+def test_offset_format(offset, formatted):
+    instant = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    zone_offset = ZoneOffset(offset, "X", instant, instant + timedelta(days=1))
+    assert zone_offset.format() == formatted
+    assert datetime(2021, 1, 1, tzinfo=zone_offset.tzinfo).strftime("%z") == formatted
@@ -0,0 +1,158 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .date_helpers import convert_24_hours
+from .zone_registry import ZoneRegistry
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+DIGITS = "0123456789"
+
+# Only locates where a time could start. The time itself is read character by character.
+TIME_START = re.compile(r"(?:^|[\s\-–—])[0-9]")
+
+
+@dataclass(frozen=True)
+class TimeMention:
+    text: str
+    hours: int
+    minutes: int
+    am_pm: Optional[str] = None
+
+    @property
+    def hours_24(self) -> int:
+        if self.am_pm:
+            return convert_24_hours(self.hours, self.am_pm.lower() == "pm")
+        return self.hours
+
+
+def _is_decimal(content: str, position: int) -> bool:
+    return position < len(content) and content[position].isdecimal()
+
+
+def _read_am_pm(content: str, position: int) -> Optional[str]:
+    am_pm = content[position : position + 2]
+    if len(am_pm) == 2 and am_pm[0] in "aApP" and am_pm[1] in "mM":
+        return am_pm
+    return None
+
+
+def _read_offset(content: str, position: int) -> int:
+    """
+    Skips over a UTC offset such as "+1" or "+05:30" following a time, returning the position after it.
+    """
+    start = position
+    if position < len(content) and content[position].isspace():
+        position += 1
+    if position >= len(content) or content[position] != "+":
+        return start
+    position += 1
+    if not _is_decimal(content, position):
+        return start
+    position += 1
+    if _is_decimal(content, position):
+        position += 1
+    for _ in range(2):
+        if (
+            position < len(content)
+            and content[position] == ":"
+            and _is_decimal(content, position + 1)
+            and _is_decimal(content, position + 2)
+        ):
+            position += 3
+    return position
+
+
+def extract_times(content: str) -> tuple[TimeMention, ...]:
+    """
+    Finds the times mentioned in a message, such as "8pm", "17:30" or "9:15 am".
+
+    A time has to start the message or follow whitespace or a dash, and needs either minutes or AM/PM to be told
+    apart from any other number.
+    """
+    start_match = TIME_START.search(content)
+    if start_match is None:
+        # Most messages, including every message without a digit
+        return ()
+
+    mentions = []
+    length = len(content)
+    while start_match:
+        start = start_match.start()
+        position = start_match.end() - 1
+
+        end = position + 1
+        if (
+            content[position] in "012"
+            and end < length
+            and content[end] in DIGITS
+        ):
+            end += 1
+        hours = int(content[position:end])
+
+        minutes = None
+        if (
+            end < length
+            and content[end] == ":"
+            and _is_decimal(content, end + 1)
+            and _is_decimal(content, end + 2)
+        ):
+            minutes = int(content[end + 1 : end + 3])
+            end += 3
+        if end < length and content[end].isspace():
+            end += 1
+        am_pm = _read_am_pm(content, end)
+        if am_pm:
+            end += 2
+        end = _read_offset(content, end)
+
+        if minutes is not None or am_pm:
+            mentions.append(
+                TimeMention(
+                    text=content[start:end],
+                    hours=hours,
+                    minutes=minutes or 0,
+                    am_pm=am_pm,
+                )
+            )
+        # Anything we've read over can't start another time, even if it wasn't one itself
+        start_match = TIME_START.search(content, end)
+    return tuple(mentions)
+
+
+def localise_times(
+    mentions: tuple[TimeMention, ...],
+    zones: ZoneRegistry,
+    zone_name: str,
+    now: datetime,
+    next_day_threshold: timedelta,
+) -> list[tuple[TimeMention, datetime]]:
+    """
+    Works out when each mentioned time is, taking it as a time today in the given timezone.
+    :param mentions: The times mentioned in a message
+    :param zones: The registry to convert times with
+    :param zone_name: The timezone of the message's author
+    :param now: The current time, shared by every mention in the message
+    :param next_day_threshold: How far in the past a time can be before it's taken to mean tomorrow
+    :return: Each mention that is a valid time, paired with when it is in UTC
+    """
+    today = zones.local_time(zone_name, now).replace(second=0, tzinfo=None)
+    localised = []
+    for mention in mentions:
+        try:
+            wall_time = today.replace(hour=mention.hours_24, minute=mention.minutes)
+        except ValueError:
+            log.error(
+                f"Failed to adjust time. Hours: {mention.hours_24}, minutes: {mention.minutes}",
+                exc_info=True,
+            )
+            continue
+        parsed_time = zones.to_utc(zone_name, wall_time)
+        if now - parsed_time > next_day_threshold:
+            parsed_time = zones.to_utc(zone_name, wall_time + timedelta(days=1))
+        localised.append((mention, parsed_time))
+    return localised
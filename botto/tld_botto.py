@@ -15,22 +15,38 @@ import discord
 from discord import Message, Guild
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-import arrow
+import pytz
 from discord.abc import GuildChannel, PrivateChannel
 
 from botto import responses
-from .date_helpers import convert_24_hours
 from .dm_helpers import get_dm_channel
 from .message_helpers import (
     remove_own_message,
-    remove_user_reactions,
+    remove_own_reactions,
     MessageMissingReferenceError,
     resolve_message_reference,
     is_voting_message,
-    guild_member_count,
 )
+from .member_counts import MemberCounts
 from .models import Meal
 from .reactions import Reactions
+from .vote_tally import VoteTally, FINISHED_EMOJI
+from .debounce import Debouncer
+from .entity_cache import EntityCache
+from .pending_deletions import PendingDeletions, DeletionKey
+from .routing import RoutingTable
+from .message_analysis import AnalysisCache, AnalysisPool, MessageAnalysis
+from .time_extraction import TimeMention, localise_times
+from .channel_activity import ChannelActivity
+from .offset_groups import group_by_offset, describe_groups
+from .reply_memo import ReplyMemo
+from .schedule_view import (
+    PAGE_EMOJI,
+    ScheduleFilter,
+    SchedulePages,
+    describe_reminder,
+    paginate,
+)
 from typing import TYPE_CHECKING
 
 
@@ -44,7 +60,9 @@ from .message_checks import is_dm
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
-CHANNEL_REGEX = re.compile(r"<#(\d+)>")
+MENTION_REGEX = re.compile(
+    r"<#(?P<channel_id>\d+)>|<a?:(?P<emoji_name>\w+):(?P<emoji_id>\d+)>"
+)
 NUMBERS = [
     "zero",
     "one",
@@ -76,6 +94,7 @@ VOTE_EMOJI = (
 )
 
 DELETE_EMOJI = ("🥕", "❌")
+MAX_SCHEDULE_REMINDERS = 100
 
 
 class TLDBotto(discord.Client):
@@ -96,6 +115,28 @@ class TLDBotto(discord.Client):
         self.timezones = timezones
         self.reminders = reminders
         self.enablement = enablement
+        self.votes = VoteTally()
+        self.member_counts = MemberCounts()
+        self.vote_evaluations = Debouncer(
+            delay=config.get("vote_evaluation_delay_seconds", 1.5),
+            max_delay=config.get("vote_evaluation_max_delay_seconds", 5),
+        )
+        self.entities = EntityCache(self, **config.get("entity_cache", {}))
+        self.routes = RoutingTable(config)
+        self.emoji_names: dict[int, dict[int, str]] = {}
+        self.channel_activity: Optional[ChannelActivity] = None
+        if config.get("group_time_conversions"):
+            self.channel_activity = ChannelActivity(
+                window_seconds=config.get("active_author_minutes", 60) * 60
+            )
+        self.time_conversions: Optional[ReplyMemo] = None
+        if memo_seconds := config.get("time_conversion_memo_seconds", 300):
+            self.time_conversions = ReplyMemo(ttl_seconds=memo_seconds)
+        self.own_reactions = reactions.outbound.ledger
+        self.schedule_pages = SchedulePages()
+        self.pending_deletions = PendingDeletions(
+            delay=config.get("delete_confirmation_seconds", 3)
+        )
         log.info(
             "Replies are enabled"
             if self.config.get("should_reply")
@@ -143,7 +184,28 @@ class TLDBotto(discord.Client):
             coalesce=True,
         )
 
+        scheduler.add_job(
+            self.reconcile_member_counts,
+            name="Reconcile member counts",
+            trigger="cron",
+            hour="*/6",
+            coalesce=True,
+        )
+
+        scheduler.add_job(
+            self.log_stats,
+            name="Log statistics",
+            trigger="cron",
+            minute="*/30",
+            coalesce=True,
+        )
+
         self.regexes: Optional[SuggestionRegexes] = None
+        self.analyses = AnalysisCache()
+        self.analysis_pool = AnalysisPool(
+            threshold=config.get("long_message_threshold", 1000),
+            workers=config.get("analysis_workers", 1),
+        )
 
         intents = discord.Intents(
             messages=True, guilds=True, reactions=True, members=True
@@ -152,7 +214,18 @@ class TLDBotto(discord.Client):
 
     async def on_connect(self):
         if not self.regexes and self.user:
-            self.regexes = compile_regexes(str(self.user.id), self.config)
+            self.set_regexes(compile_regexes(str(self.user.id), self.config))
+
+    def set_regexes(self, regexes: SuggestionRegexes):
+        self.regexes = regexes
+        # Cached analyses were made with the old regexes
+        self.analyses.clear()
+        self.analysis_pool.start(regexes)
+
+    async def close(self):
+        self.analysis_pool.shutdown()
+        self.reminders.dispatcher.stop()
+        await super().close()
 
     async def random_presence(self):
         chosen_status = random.choice(self.config["watching_statūs"])
@@ -168,11 +241,11 @@ class TLDBotto(discord.Client):
         log.info("We have logged in as {0.user}".format(self))
 
         if not self.regexes:
-            self.regexes = compile_regexes(str(self.user.id), self.config)
+            self.set_regexes(compile_regexes(str(self.user.id), self.config))
 
         await self.random_presence()
 
-        self.reminders.start(self.get_or_fetch_channel)
+        self.reminders.start(self.get_or_fetch_channel, self.get_or_fetch_message)
 
         reminder_log_text = ", ".join(
             [
@@ -182,6 +255,27 @@ class TLDBotto(discord.Client):
         )
         log.info(f"Meal reminders for: {reminder_log_text}")
 
+    async def reconcile_member_counts(self):
+        self.member_counts.reconcile_all(self.guilds)
+
+    async def on_guild_available(self, guild: discord.Guild):
+        self.member_counts.reconcile(guild)
+
+    async def on_guild_join(self, guild: discord.Guild):
+        self.member_counts.reconcile(guild)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.member_counts.forget(guild)
+
+    async def on_member_join(self, member: discord.Member):
+        self.member_counts.member_joined(member)
+
+    async def on_member_remove(self, member: discord.Member):
+        self.member_counts.member_removed(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.member_counts.member_updated(before, after)
+
     async def on_disconnect(self):
         log.warning("Bot disconnected")
 
@@ -202,16 +296,34 @@ class TLDBotto(discord.Client):
     async def get_or_fetch_channel(
         self, channel_id: int
     ) -> Union[GuildChannel, PrivateChannel, discord.Thread]:
-        if channel := self.get_channel(channel_id):
-            return channel
-        else:
-            return await self.fetch_channel(channel_id)
+        return await self.entities.get_channel(channel_id)
 
     async def get_or_fetch_user(self, user_id: int) -> Union[discord.User]:
-        if user := self.get_user(user_id):
-            return user
-        else:
-            return await self.fetch_user(user_id)
+        return await self.entities.get_user(user_id)
+
+    async def get_or_fetch_message(
+        self,
+        channel: discord.abc.Messageable,
+        message_id: int,
+        fresh: bool = False,
+        with_reactions: bool = False,
+    ) -> Message:
+        return await self.entities.get_message(
+            channel, message_id, fresh=fresh, with_reactions=with_reactions
+        )
+
+    async def log_stats(self):
+        for cache_stats in self.entities.stats():
+            log.info(cache_stats)
+        log.info(self.reactions.outbound.stats())
+        log.info(self.analyses.stats())
+        log.info(self.analysis_pool.stats())
+        if self.time_conversions:
+            log.info(self.time_conversions.stats())
+        log.info(self.reminders.dispatcher.stats())
+        for reminder_stats in self.reminders.metrics.stats():
+            log.info(reminder_stats)
+        log.info(self.reminders.time_parser.stats())
 
     async def get_meal_channels(self):
         for guild in self.config["meals"]["guilds"]:
@@ -221,43 +333,149 @@ class TLDBotto(discord.Client):
         self, message: Message, reaction_type: str, default: str = None
     ):
         if reaction := self.config["reactions"].get(reaction_type, default):
-            await message.add_reaction(reaction)
+            await self.reactions.add(message, reaction)
 
     def is_voting_channel(self, channel: discord.abc.Messageable) -> bool:
-        if isinstance(channel, discord.TextChannel) or isinstance(
-            channel, discord.Thread
-        ):
-            return channel.name in self.config["channels"]["voting"]
-        else:
-            return False
+        return self.routes.route(channel).voting
 
-    async def on_raw_reaction_remove(self, payload):
+    def is_voting(self, channel: discord.abc.Messageable, message: Message) -> bool:
+        route = self.routes.route(channel)
+        return route.voting or (
+            route.any_message_voting and is_voting_message(message)
+        )
 
-        if payload.emoji.name not in VOTE_EMOJI:
+    def schedule_vote_evaluation(
+        self, channel: discord.abc.Messageable, message_id: int
+    ):
+        self.vote_evaluations.schedule(
+            message_id, lambda: self.update_vote_flag(channel, message_id)
+        )
+
+    async def update_vote_flag(self, channel: discord.abc.Messageable, message_id: int):
+        if not (state := self.votes.get(message_id)):
+            log.debug(f"No votes tracked for {message_id}. Not updating flag.")
             return
+        expected_reacted_count = self.member_counts.get(channel.guild)
+        flag_change = state.flag_change(expected_reacted_count)
+        # Record the new flag state before awaiting so concurrent handlers don't repeat the request
+        if flag_change is True:
+            state.flagged = True
+            await self.reactions.add(
+                channel.get_partial_message(message_id), FINISHED_EMOJI
+            )
+        elif flag_change is False:
+            state.flagged = False
+            await channel.get_partial_message(message_id).remove_reaction(
+                FINISHED_EMOJI, self.user
+            )
+            self.own_reactions.removed(message_id, FINISHED_EMOJI)
+        elif not state.flagged:
+            log.info(
+                f"Waiting for another {expected_reacted_count - state.voter_count} people to vote."
+            )
 
-        channel = await self.fetch_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
-        log.info(f"Channel: {channel}")
-        log.info(f"Message: {message}")
-        log.info(f"Reactions: {message.reactions}")
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        self.entities.reactions_changed(payload.message_id)
+        if payload.user_id == self.user.id:
+            self.own_reactions.removed(payload.message_id, str(payload.emoji))
+            return
+        if payload.emoji.name in PAGE_EMOJI:
+            await self.turn_schedule_page(payload)
+            return
 
-        if self.is_voting_channel(channel) or (
-            str(message.guild.id) in self.config["any_channel_voting_guilds"]
-            and is_voting_message(message)
+        if payload.emoji.name in DELETE_EMOJI and self.pending_deletions.cancel(
+            DeletionKey(payload.message_id, payload.user_id, payload.emoji.name)
         ):
-            reacted_users = set()
-            for reaction in message.reactions:
-                if reaction.emoji not in VOTE_EMOJI:
-                    continue
-                users = await reaction.users().flatten()
-                reacted_users |= set(u for u in users if u != self.user)
-            if len(reacted_users) != guild_member_count(message):
-                await message.remove_reaction("🏁", self.user)
+            log.info("Delete reaction removed. Not removing our message.")
+
+        if payload.emoji.name not in VOTE_EMOJI:
+            return
+
+        channel = await self.get_or_fetch_channel(payload.channel_id)
+        if state := self.votes.get(payload.message_id):
+            state.remove(payload.emoji.name, payload.user_id)
+        else:
+            route = self.routes.route(channel)
+            if not route.voting and not route.any_message_voting:
+                return
+            message = await self.get_or_fetch_message(
+                channel, payload.message_id, with_reactions=True
+            )
+            log.info(f"Channel: {channel}")
+            log.info(f"Message: {message}")
+            log.info(f"Reactions: {message.reactions}")
+            if not self.is_voting(channel, message):
+                return
+            state = await self.votes.get_or_seed(message, self.user.id, VOTE_EMOJI)
+            state.remove(payload.emoji.name, payload.user_id)
+
+        self.schedule_vote_evaluation(channel, payload.message_id)
+
+    def forget_messages(self, *message_ids: int):
+        self.entities.invalidate_messages(*message_ids)
+        self.votes.forget(*message_ids)
+        for message_id in message_ids:
+            self.reactions.outbound.cancel_message(message_id)
+            self.own_reactions.cleared(message_id)
+            self.vote_evaluations.cancel(message_id)
+            self.pending_deletions.cancel_message(message_id)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.forget_messages(payload.message_id)
+
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
+        self.forget_messages(*payload.message_ids)
+
+    async def on_raw_reaction_clear(self, payload: discord.RawReactionClearEvent):
+        self.forget_messages(payload.message_id)
+
+    async def on_raw_reaction_clear_emoji(
+        self, payload: discord.RawReactionClearEmojiEvent
+    ):
+        self.entities.reactions_changed(payload.message_id)
+        self.own_reactions.cleared(payload.message_id, str(payload.emoji))
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        self.entities.invalidate_messages(payload.message_id)
+
+    async def on_guild_channel_create(self, channel: GuildChannel):
+        self.routes.update(channel)
+
+    async def on_guild_channel_update(self, before: GuildChannel, after: GuildChannel):
+        if before.name != after.name:
+            log.debug(f"Channel {before.name} renamed to {after.name}")
+            self.routes.update(after)
+
+    async def on_guild_channel_delete(self, channel: GuildChannel):
+        self.entities.invalidate_channel(channel.id)
+        self.routes.remove(channel.id)
+        if self.channel_activity:
+            self.channel_activity.forget_channel(channel.id)
+        if self.time_conversions:
+            self.time_conversions.forget_channel(channel.id)
+
+    async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
+        if before.name != after.name:
+            self.routes.update(after)
+
+    async def on_thread_delete(self, thread: discord.Thread):
+        self.entities.invalidate_channel(thread.id)
+        self.routes.remove(thread.id)
+        if self.channel_activity:
+            self.channel_activity.forget_channel(thread.id)
+        if self.time_conversions:
+            self.time_conversions.forget_channel(thread.id)
 
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        self.entities.reactions_changed(payload.message_id)
         if payload.user_id == self.user.id:
             log.info("Reaction from self. Ignoring.")
+            self.own_reactions.added(payload.message_id, str(payload.emoji))
+            return
+        if payload.emoji.name in PAGE_EMOJI:
+            await self.turn_schedule_page(payload)
             return
         is_vote = payload.emoji.name in VOTE_EMOJI
         is_delete = payload.emoji.name in DELETE_EMOJI
@@ -267,7 +485,21 @@ class TLDBotto(discord.Client):
         log.info(f"Reaction received: {payload}")
 
         channel = await self.get_or_fetch_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
+
+        # Votes on messages we're already tallying don't need the message itself,
+        # unless they might be answering a 'party?'
+        if (
+            is_vote
+            and not is_delete
+            and payload.emoji.name
+            not in (self.config["reactions"]["confirm"], self.config["reactions"]["decline"])
+            and (state := self.votes.get(payload.message_id))
+        ):
+            state.add(payload.emoji.name, payload.user_id)
+            self.schedule_vote_evaluation(channel, payload.message_id)
+            return
+
+        message = await self.get_or_fetch_message(channel, payload.message_id)
         log.info(f"Channel: {channel}")
         log.info(f"Message: {message}")
         log.info(f"Reactions: {message.reactions}")
@@ -280,69 +512,64 @@ class TLDBotto(discord.Client):
                 await message.remove_reaction(
                     self.config["reactions"]["unknown"], self.user
                 )
-                for reaction in self.config["reactions"]["party"]:
-                    await message.add_reaction(reaction)
+                await self.reactions.outbound.add_all(
+                    message, self.config["reactions"]["party"]
+                )
             elif payload.emoji.name in self.config["reactions"]["decline"]:
-                await remove_user_reactions(message, self.user)
+                await remove_own_reactions(
+                    message, self.user, self.own_reactions.get(message.id)
+                )
 
         if is_delete and not (
-            str(message.guild.id) in self.config["any_channel_voting_guilds"]
+            self.routes.route(channel).any_message_voting
             and is_voting_message(message)
         ):
             log.info(f"'{payload.emoji.name}' is a delete reaction")
-            emoji: discord.PartialEmoji = payload.emoji
-            # Wait 3 seconds to make sure this wasn't accidental
-            await asyncio.sleep(3)
-            # Re-fetch the message (to make sure we have the latest reactions) and check emoji is still there
-            message: discord.Message = await channel.fetch_message(payload.message_id)
-            if not any(
-                (reaction.emoji == emoji.name for reaction in message.reactions)
-            ):
-                log.warning("Reaction no longer present. Not removing our message.")
-                return
-            if message.author.id == self.user.id:
-                log.debug("Reaction still present; removing our message.")
-                requester: discord.User = (
-                    payload.member if payload.member else self.get_user(payload.user_id)
-                )
-                requester_name = (
-                    requester.name if requester else f"User with ID {payload.user_id}"
+            if message.author.id != self.user.id and message.author.id == payload.user_id:
+                log.info(
+                    f"{payload.member or payload.user_id} attempted to removed reactions from their own message!"
                 )
-                await remove_own_message(requester_name, message)
-            else:
-                user = payload.member or await self.get_or_fetch_user(payload.user_id)
-                if message.author.id == payload.user_id:
-                    log.info(
-                        f"{user} attempted to removed reactions from their own message!"
-                    )
-                    return
-                log.debug("Reaction still present; removing our reactions.")
-                await remove_user_reactions(message, self.user)
-                log.debug("Removing triggering reaction.")
-                await message.remove_reaction(emoji, user)
+                return
+            # Wait to make sure this wasn't accidental. Removing the reaction in the meantime cancels the deletion.
+            self.pending_deletions.add(
+                DeletionKey(payload.message_id, payload.user_id, payload.emoji.name),
+                lambda: self.confirm_deletion(message, payload),
+            )
             return
 
         # At this point, we only need to handle voting reactions
         if not is_vote:
             return
 
-        if self.is_voting_channel(channel) or (
-            str(message.guild.id) in self.config["any_channel_voting_guilds"]
-            and is_voting_message(message)
-        ):
-            reacted_users = set()
-            for reaction in message.reactions:
-                if reaction.emoji not in VOTE_EMOJI:
-                    continue
-                users = await reaction.users().flatten()
-                reacted_users |= set(u for u in users if u != self.user)
-            expected_reacted_count = guild_member_count(message)
-            if len(reacted_users) == expected_reacted_count:
-                await message.add_reaction("🏁")
-            else:
-                log.info(
-                    f"Waiting for another {expected_reacted_count - len(reacted_users)} people to vote."
+        if self.is_voting(channel, message):
+            if not self.votes.get(payload.message_id):
+                message = await self.get_or_fetch_message(
+                    channel, payload.message_id, with_reactions=True
                 )
+            state = await self.votes.get_or_seed(message, self.user.id, VOTE_EMOJI)
+            state.add(payload.emoji.name, payload.user_id)
+            self.schedule_vote_evaluation(channel, payload.message_id)
+
+    async def confirm_deletion(
+        self, message: Message, payload: discord.RawReactionActionEvent
+    ):
+        if message.author.id == self.user.id:
+            log.debug("Reaction still present; removing our message.")
+            requester: discord.User = (
+                payload.member if payload.member else self.get_user(payload.user_id)
+            )
+            requester_name = (
+                requester.name if requester else f"User with ID {payload.user_id}"
+            )
+            await remove_own_message(requester_name, message)
+        else:
+            user = payload.member or await self.get_or_fetch_user(payload.user_id)
+            log.debug("Reaction still present; removing our reactions.")
+            await remove_own_reactions(
+                message, self.user, self.own_reactions.get(message.id)
+            )
+            log.debug("Removing triggering reaction.")
+            await message.remove_reaction(payload.emoji, user)
 
     async def on_message(self, message: Message):
         if message.author.id == self.user.id:
@@ -353,64 +580,59 @@ class TLDBotto(discord.Client):
             await self.process_dm(message)
             return
 
-        channel_name = message.channel.name
+        if self.channel_activity and not message.author.bot:
+            self.channel_activity.seen(message.channel.id, message.author.id)
 
-        if self.is_voting_channel(message.channel) or (
-            str(message.guild.id) in self.config["any_channel_voting_guilds"]
-            and is_voting_message(message)
-        ):
-            for emoji in VOTE_EMOJI:
-                if emoji in message.content:
-                    await message.add_reaction(emoji)
+        if self.is_voting(message.channel, message):
+            await self.reactions.outbound.add_all(
+                message, [emoji for emoji in VOTE_EMOJI if emoji in message.content]
+            )
 
-        if (
-            self.config["channels"]["include"]
-            and channel_name not in self.config["channels"]["include"]
-        ):
+        if not self.routes.route(message.channel).handles_suggestions:
             return
-        else:
-            if channel_name in self.config["channels"]["exclude"]:
-                return
 
         await self.process_suggestion(message)
 
-    def clean_message(self, actual_motto: str, guild: Guild) -> str:
+    def guild_emoji_names(self, guild: Guild) -> dict[int, str]:
+        if (emoji_names := self.emoji_names.get(guild.id)) is None:
+            emoji_names = {emoji.id: emoji.name for emoji in guild.emojis}
+            self.emoji_names[guild.id] = emoji_names
+        return emoji_names
 
-        for channel_id in CHANNEL_REGEX.findall(actual_motto):
-            channel = self.get_channel(int(channel_id))
-            if not channel:
-                continue
-            actual_motto = actual_motto.replace(f"<#{channel_id}>", f"#{channel.name}")
-
-        server_emojis = {x.name: str(x) for x in guild.emojis}
-        for emoji in server_emojis:
-            if server_emojis[emoji] in actual_motto:
-                actual_motto = actual_motto.replace(server_emojis[emoji], f":{emoji}:")
-
-        return actual_motto
-
-    def check_triggers(self, message: Message) -> tuple[Callable, re.Match]:
-        def search_triggers(content: str, trigger_dict: dict):
-            for name, triggers in trigger_dict.items():
-                for trigger in triggers:
-                    if matched := trigger.match(content):
-                        return name, matched
-
-        at_command = None
-        for t in self.regexes.at_command:
-            if match := t.match(message.content):
-                if command_group := match.group("command"):
-                    at_command = command_group.strip()
-        if at_command:
-            trigger_details = search_triggers(at_command, self.regexes.at_triggers)
-        else:
-            trigger_details = search_triggers(message.content, self.regexes.triggers)
+    async def on_guild_emojis_update(
+        self, guild: Guild, before: list[discord.Emoji], after: list[discord.Emoji]
+    ):
+        self.emoji_names.pop(guild.id, None)
 
-        if trigger_details:
-            resolved_name = trigger_details[0]
-            resolved_matched = trigger_details[1]
-            if trigger_func := self.trigger_funcs.get(resolved_name):
-                return trigger_func, resolved_matched
+    def clean_message(self, actual_motto: str, guild: Guild) -> str:
+        if "<" not in actual_motto:
+            return actual_motto
+        emoji_names = self.guild_emoji_names(guild)
+
+        def replace_mention(match: re.Match) -> str:
+            if channel_id := match.group("channel_id"):
+                if channel := self.get_channel(int(channel_id)):
+                    return f"#{channel.name}"
+            elif emoji_name := emoji_names.get(int(match.group("emoji_id"))):
+                return f":{emoji_name}:"
+            return match.group(0)
+
+        return MENTION_REGEX.sub(replace_mention, actual_motto)
+
+    async def analyse_message(self, content: str) -> MessageAnalysis:
+        if analysis := self.analyses.get(content):
+            return analysis
+        analysis = await self.analysis_pool.analyse(self.regexes, content)
+        self.analyses.put(content, analysis)
+        return analysis
+
+    async def check_triggers(
+        self, message: Message, analysis: Optional[MessageAnalysis] = None
+    ) -> Optional[tuple[Callable, dict]]:
+        analysis = analysis or await self.analyse_message(message.content)
+        if trigger := analysis.trigger:
+            if trigger_func := self.trigger_funcs.get(trigger.name):
+                return trigger_func, trigger.groups
 
     @property
     def trigger_funcs(self):
@@ -427,139 +649,144 @@ class TLDBotto(discord.Client):
         }
 
     @staticmethod
-    async def handle_trigger(
-        message: Message, trigger_details: tuple[Callable, re.Match]
-    ):
+    async def handle_trigger(message: Message, trigger_details: tuple[Callable, dict]):
         if trigger_func := trigger_details[0]:
-            if groups := trigger_details[1].groupdict():
+            if groups := trigger_details[1]:
                 await trigger_func(message, **groups)
             else:
                 await trigger_func(message)
             return
 
     @property
-    def simple_reactions(self) -> list[tuple[Callable, Callable]]:
-        return [
-            (
-                lambda content: self.regexes.apologising.search(content)
-                and not self.regexes.sorry.search(content),
-                self.reactions.rule_1,
+    def reaction_funcs(self) -> dict[str, Callable]:
+        return {
+            "rule_1": lambda message, _: self.reactions.rule_1(message),
+            "sorry": lambda message, _: self.reactions.love(message),
+            "love": lambda message, _: self.reactions.love(message),
+            "hug": lambda message, _: self.reactions.hug(message),
+            "party": self.reactions.party,
+            "food": lambda message, food_char: self.reactions.food(
+                self.regexes, message, food_char
             ),
-            (lambda content: self.regexes.sorry.search(content), self.reactions.love),
-            (lambda content: self.regexes.love.search(content), self.reactions.love),
-            (lambda content: self.regexes.hug.search(content), self.reactions.hug),
-        ]
+            "unrecognised_food": lambda message, _: self.reactions.unrecognised_food(
+                message
+            ),
+            "pattern": self.react_to_pattern,
+        }
 
-    async def react(self, message):
-        has_matched = False
-        for reaction in self.simple_reactions:
-            if reaction[0](message.content):
-                await reaction[1](message)
-                has_matched = True
-        if party_match := self.regexes.party.search(message.content):
-            matched_string = party_match.group("partyword")
-            await self.reactions.party(message, matched_string)
-            has_matched = True
-        if food := self.regexes.food.food_regex.search(message.content):
-            food_char = food.group(1)
-            await self.reactions.food(self.regexes, message, food_char)
-            has_matched = True
-        elif self.regexes.food.not_food_regex.search(message.content):
-            await self.reactions.unrecognised_food(message)
-            has_matched = True
-        if pattern_name := self.regexes.patterns.matches(message.content):
-            log.info(f"{pattern_name.capitalize()} from {message.author}")
-            await self.reactions.pattern(pattern_name, message)
-            has_matched = True
-        return has_matched
-
-    async def match_times(self, message: Message):
-        def is_time(maybe_time: re.Match):
-            if maybe_time.group("hours"):
-                if maybe_time.group("minutes"):
-                    return True
-                elif am_pm := maybe_time.group("am_pm"):
-                    if am_pm.upper() in ("AM", "PM"):
-                        return True
-            return False
-
-        time_matches = [
-            match
-            for match in self.regexes.convert_time.finditer(message.content)
-            if is_time(match)
-        ]
+    async def react_to_pattern(self, message: Message, pattern_name: str):
+        log.info(f"{pattern_name.capitalize()} from {message.author}")
+        await self.reactions.pattern(pattern_name, message)
+
+    async def react(self, message, analysis: Optional[MessageAnalysis] = None):
+        analysis = analysis or await self.analyse_message(message.content)
+        reaction_funcs = self.reaction_funcs
+        for reaction in analysis.reactions:
+            await reaction_funcs[reaction.rule](message, reaction.value)
+        return len(analysis.reactions) > 0
+
+    async def match_times(
+        self, message: Message, analysis: Optional[MessageAnalysis] = None
+    ):
+        analysis = analysis or await self.analyse_message(message.content)
+        time_matches = analysis.times
 
         num_matches = len(time_matches)
         if num_matches > 0:
             log.info(f"Message contained {num_matches} times")
             try:
-                response_string = await self.process_time_matches(
-                    message.author, time_matches
+                response_string, conversions = await self.process_time_matches(
+                    message.author, time_matches, message.channel
                 )
+                if not response_string:
+                    log.info("No new times to convert. Not replying.")
+                    return
                 log.info(f"Responding with: {response_string}")
-                await message.reply(
-                    response_string,
-                    allowed_mentions=discord.AllowedMentions(replied_user=False),
-                )
+                try:
+                    await message.reply(
+                        response_string,
+                        allowed_mentions=discord.AllowedMentions(replied_user=False),
+                    )
+                except Exception:
+                    # Nothing was posted, so don't hold back the same conversions next time
+                    if self.time_conversions:
+                        self.time_conversions.forget(
+                            message.channel.id, message.author.id, conversions
+                        )
+                    raise
             except ValueError:
                 log.error(f"Failed to process times: {time_matches}", exc_info=True)
 
     async def process_time_matches(
-        self, author: discord.User, matches: list[re.Match]
-    ) -> str:
-
+        self,
+        author: discord.User,
+        matches: tuple[TimeMention, ...],
+        channel: Optional[discord.abc.Messageable] = None,
+    ) -> tuple[str, list[tuple[TimeMention, datetime]]]:
+        """
+        :return: The reply converting the times, and the conversions it includes
+        """
         tlder = await self.timezones.get_tlder(str(author.id))
         timezone = await self.timezones.get_timezone(tlder.timezone_id)
 
-        parsed_local_times = []
-        for match in matches:
-
-            hours = int(match.group("hours"))
-            minutes = match.group("minutes")
-            ampm = match.group("am_pm")
-            minutes = int(minutes[1:]) if minutes else 0
-            hours = convert_24_hours(hours, ampm.lower() == "pm") if ampm else hours
-
-            now = arrow.now()
-            try:
-                parsed_time = now.replace(
-                    hour=hours, minute=minutes, second=0, tzinfo=timezone.name
-                )
-            except ValueError:
-                log.error(
-                    f"Failed to adjust time. Hours: {hours}, minutes: {minutes}",
-                    exc_info=True,
-                )
-                continue
-
-            if now - parsed_time > timedelta(
+        now = datetime.now(pytz.utc)
+        parsed_local_times = localise_times(
+            matches,
+            zones=self.timezones.zones,
+            zone_name=timezone.name,
+            now=now,
+            next_day_threshold=timedelta(
                 hours=self.config["time_is_next_day_threshold_hours"]
-            ):
-                parsed_time = parsed_time + timedelta(days=1)
-
-            parsed_local_times.append((match.group(0), parsed_time))
+            ),
+        )
+        if self.time_conversions and channel is not None:
+            parsed_local_times = self.time_conversions.filter(
+                channel.id, author.id, parsed_local_times
+            )
+            if not parsed_local_times:
+                return "", []
+
+        offset_groups = []
+        if self.channel_activity and channel is not None:
+            active_zones = self.timezones.cached_zones(
+                author_id
+                for author_id in self.channel_activity.active(channel.id)
+                if author_id != author.id
+            )
+            offset_groups = group_by_offset(
+                self.timezones.zones,
+                {
+                    zone_name: [active_tlder.name for active_tlder in tlders]
+                    for zone_name, tlders in active_zones.items()
+                },
+                now,
+            )
 
-        conversion_string_intro = [
-            "{time} in {tlder_name}'s timezone is <t:{unix_time}:t> (<t:{unix_time}:R>) for you.".format(
-                time=time[0],
-                tlder_name=tlder.name,
-                unix_time=floor(time[1].timestamp()),
+        conversion_string_intro = []
+        for time in parsed_local_times:
+            conversion_string_intro.append(
+                "{time} in {tlder_name}'s timezone is <t:{unix_time}:t> (<t:{unix_time}:R>) for you.".format(
+                    time=time[0].text,
+                    tlder_name=tlder.name,
+                    unix_time=floor(time[1].timestamp()),
+                )
             )
-            for time in parsed_local_times
-        ]
-        return "\n".join(conversion_string_intro)
+            conversion_string_intro.extend(describe_groups(time[1], offset_groups))
+        return "\n".join(conversion_string_intro), parsed_local_times
 
     async def process_suggestion(self, message: Message):
-        if trigger_result := self.check_triggers(message):
+        analysis = await self.analyse_message(message.content)
+        if trigger_result := await self.check_triggers(message, analysis):
             await self.handle_trigger(message, trigger_result)
 
-        await self.match_times(message)
+        await self.match_times(message, analysis)
 
-        await self.react(message)
+        await self.react(message, analysis)
         return
 
     async def process_dm(self, message: Message):
-        await self.match_times(message)
+        analysis = await self.analyse_message(message.content)
+        await self.match_times(message, analysis)
 
         if message.author == self.user:
             return
@@ -568,7 +795,7 @@ class TLDBotto(discord.Client):
             f"Received direct message (ID: {message.id}) from {message.author}: {message.content}"
         )
 
-        if trigger_result := self.check_triggers(message):
+        if trigger_result := await self.check_triggers(message, analysis):
             await self.handle_trigger(message, trigger_result)
             return
 
@@ -585,7 +812,7 @@ class TLDBotto(discord.Client):
 Reply to a great motto in the supported channels with {trigger} to tell me about it! You can nominate a section of a message with \"{trigger} <excerpt>\". (Note: you can't nominate yourself.)
 
 You can DM me the following commands:
-`!schedule`: Show the current schedule of reminders
+`!schedule`: Show the current schedule of reminders. Add `mine`, `here`, a #channel or a number of hours (like `6h`) to only show some of them. React with ◀️ or ▶️ to page through it.
 `!bottoyellat<name>. <message>`: Get Tildy to yell at someone.
 {self.reminders.reminder_syntax}: Get Tildy to remind you. Include '🕰' in `message` to also receive a reminder 15 minutes prior.
 `!emoji <emoji>`: Set your emoji on the leaderboard. A response of {self.config["reactions"]["invalid_emoji"]} means the emoji you requested is not valid.
@@ -638,13 +865,14 @@ You can DM me the following commands:
             await dm_channel.send(response)
             return
 
-        if not await self.react(message):
+        if not await self.react(message, analysis):
             await self.reactions.unknown_dm(message)
 
     @property
     def local_times(self) -> list[datetime]:
-        time_now = datetime.utcnow()
-        return [zone.fromutc(time_now) for zone in self.config["timezones"]]
+        return self.timezones.zones.local_times(
+            zone.zone for zone in self.config["timezones"]
+        )
 
     async def get_meal_reminder_text(self):
         configured_meals = await self.storage.get_meals()
@@ -716,38 +944,52 @@ You can DM me the following commands:
             local_times_string = responses.get_local_times(local_times=self.local_times)
             await reply_to.reply(local_times_string)
 
-    async def send_schedule(self, reply_to: Message):
+    async def send_schedule(self, reply_to: Message, filters: Optional[str] = None):
         log.info(f"Schedule from: {reply_to.author}")
-        async with reply_to.channel.typing():
-            await self.reminders.refresh_reminders()
-            current_time = f"\nBotto time is {datetime.now().strftime('%H:%M:%S %Z')}"
-            regular_jobs = (
-                job
-                for job in self.scheduler.get_jobs()
-                if not job.name.startswith("Reminder: ")
-            )
-            reminder_jobs = (
-                job
-                for job in self.scheduler.get_jobs()
-                if job.name.startswith("Reminder:")
-            )
-            job_descs = [
+        schedule_filter = ScheduleFilter.parse(filters, reply_to.channel.id)
+        reminders, total = self.reminders.find_reminders(
+            requester_id=reply_to.author.id if schedule_filter.mine else None,
+            channel_id=schedule_filter.channel_id,
+            within=schedule_filter.within,
+            limit=MAX_SCHEDULE_REMINDERS,
+        )
+        lines = []
+        if not schedule_filter.active:
+            lines.append("Regular jobs:")
+            lines += [
                 f"- `{job.name}` next running at {job.next_run_time.strftime('%a %H:%M:%S %Z')}"
-                for job in regular_jobs
-            ]
-            reminder_job_descs = [
-                f"- `{job.name.lstrip('Reminder:')}` running at {job.next_run_time.strftime('%a %H:%M:%S %Z')}."
-                f" Ref `{job.id}`"
-                for job in reminder_jobs
+                for job in self.scheduler.get_jobs()
             ]
-            regular_jobs_text = "Regular jobs:\n" + "\n".join(job_descs)
-            reminder_jobs_text = "\nReminder jobs:\n" + "\n".join(reminder_job_descs)
-            response_text = (
-                regular_jobs_text + reminder_jobs_text
-                if len(reminder_job_descs) > 0
-                else regular_jobs_text
-            )
-            await reply_to.reply(response_text + current_time)
+        if schedule_filter.active:
+            lines.append(f"Reminder jobs ({schedule_filter.describe()}):")
+            if not reminders:
+                lines.append("- None")
+        elif reminders:
+            lines.append("Reminder jobs:")
+        lines += [describe_reminder(reminder) for reminder in reminders]
+        if total > len(reminders):
+            lines.append(f"…and {total - len(reminders)} more")
+
+        current_time = f"\nBotto time is {datetime.now().strftime('%H:%M:%S %Z')}"
+        pages = paginate(lines)
+        page_texts = [
+            "\n".join(page)
+            + (f"\nPage {index + 1} of {len(pages)}" if len(pages) > 1 else "")
+            + current_time
+            for index, page in enumerate(pages)
+        ]
+        reply = await reply_to.reply(page_texts[0])
+        if len(page_texts) > 1:
+            self.schedule_pages.add(reply.id, reply_to.author.id, page_texts)
+            for emoji in PAGE_EMOJI:
+                await self.reactions.add(reply, emoji)
+
+    async def turn_schedule_page(self, payload: discord.RawReactionActionEvent):
+        if page := self.schedule_pages.turn(
+            payload.message_id, payload.user_id, payload.emoji.name
+        ):
+            channel = await self.get_or_fetch_channel(payload.channel_id)
+            await channel.get_partial_message(payload.message_id).edit(content=page)
 
     @staticmethod
     async def yell_at_someone(message: Message, **kwargs):
@@ -768,9 +1010,8 @@ You can DM me the following commands:
 
     async def remove_reactions(self, message: Message):
         try:
-            referenced_message = await resolve_message_reference(
-                self, message, force_fresh=True
-            )
+            # Our reactions are tracked in the ledger, so the referenced message doesn't need to be fresh
+            referenced_message = await resolve_message_reference(self, message)
         except MessageMissingReferenceError:
             log.info(
                 f"{message.author} triggered reaction removal but message was not a reply"
@@ -786,7 +1027,7 @@ You can DM me the following commands:
             return
 
         # This is a valid request, so indicate it was recognised
-        await message.add_reaction("👍")
+        await self.reactions.add(message, "👍")
         if referenced_message.author.id == self.user.id:
             # Message was us, so we'll remove
             await remove_own_message(message.author.name, referenced_message, delay=1)
@@ -799,7 +1040,11 @@ You can DM me the following commands:
                     message_author_id=referenced_message.author.id,
                 )
             )
-            await remove_user_reactions(referenced_message, self.user)
+            await remove_own_reactions(
+                referenced_message,
+                self.user,
+                self.own_reactions.get(referenced_message.id),
+            )
         await message.delete(delay=5)
 
     async def record_enablement(self, message: Message, **kwargs):
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Iterable
+
+import discord
+from discord import Message
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+FINISHED_EMOJI = "🏁"
+
+
+@dataclass
+class VoteState:
+    votes: dict[str, set[int]] = field(default_factory=dict)
+    flagged: bool = False
+
+    @property
+    def voter_count(self) -> int:
+        voters = set()
+        for users in self.votes.values():
+            voters |= users
+        return len(voters)
+
+    def add(self, emoji: str, user_id: int):
+        self.votes.setdefault(emoji, set()).add(user_id)
+
+    def remove(self, emoji: str, user_id: int):
+        if users := self.votes.get(emoji):
+            users.discard(user_id)
+
+    def flag_change(self, expected_voters: int) -> Optional[bool]:
+        """
+        Works out whether the finished flag needs to change.
+        :param expected_voters: The number of people expected to vote
+        :return: True if the flag should be added, False if it should be removed, None if it's correct already
+        """
+        is_complete = self.voter_count == expected_voters
+        if is_complete and not self.flagged:
+            return True
+        elif not is_complete and self.flagged:
+            return False
+        return None
+
+
+class VoteTally:
+    """
+    Tracks votes on voting messages so reactions can be counted without re-fetching every voter.
+
+    Each message is seeded once from its reactions, and then kept up to date from raw reaction events.
+    """
+
+    def __init__(self, max_messages: int = 500):
+        self.max_messages = max_messages
+        self.states: OrderedDict[int, VoteState] = OrderedDict()
+        self.seeding: dict[int, asyncio.Task] = {}
+
+    def get(self, message_id: int) -> Optional[VoteState]:
+        if state := self.states.get(message_id):
+            self.states.move_to_end(message_id)
+        return state
+
+    def forget(self, *message_ids: int):
+        for message_id in message_ids:
+            self.states.pop(message_id, None)
+
+    async def get_or_seed(
+        self, message: Message, own_id: int, vote_emoji: Iterable[str]
+    ) -> VoteState:
+        if state := self.get(message.id):
+            return state
+        # Concurrent events for the same message share a single seeding fetch
+        if not (seeding := self.seeding.get(message.id)):
+            seeding = asyncio.create_task(self._seed(message, own_id, vote_emoji))
+            self.seeding[message.id] = seeding
+        try:
+            return await asyncio.shield(seeding)
+        finally:
+            self.seeding.pop(message.id, None)
+
+    async def _seed(
+        self, message: Message, own_id: int, vote_emoji: Iterable[str]
+    ) -> VoteState:
+        log.debug(f"Seeding vote tally for message {message.id}")
+        state = VoteState()
+        for reaction in message.reactions:
+            if reaction.emoji == FINISHED_EMOJI:
+                state.flagged = reaction.me
+            if reaction.emoji not in vote_emoji:
+                continue
+            users: list[discord.User] = await reaction.users().flatten()
+            state.votes[reaction.emoji] = set(u.id for u in users if u.id != own_id)
+        self.states[message.id] = state
+        while len(self.states) > self.max_messages:
+            self.states.popitem(last=False)
+        return state
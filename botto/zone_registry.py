@@ -0,0 +1,178 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional, Iterable
+
+import pytz
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.DEBUG)
+
+SCAN_STEP = timedelta(days=7)
+SCAN_HORIZON = timedelta(days=366)
+# Enough for the current period, and the ones either side of it
+MAX_PERIODS = 3
+
+
+@dataclass(frozen=True)
+class ZoneOffset:
+    """
+    A timezone's offset from UTC, for the period between two of its transitions.
+    """
+
+    offset: timedelta
+    abbreviation: str
+    valid_from: datetime
+    valid_until: datetime
+
+    @property
+    def tzinfo(self) -> timezone:
+        return timezone(self.offset, self.abbreviation)
+
+    def covers(self, instant: datetime) -> bool:
+        return self.valid_from <= instant < self.valid_until
+
+    def format(self) -> str:
+        """
+        The offset in the same form as arrow's "Z" token, e.g. "+0100".
+        """
+        sign = "-" if self.offset < timedelta(0) else "+"
+        minutes = abs(self.offset) // timedelta(minutes=1)
+        return f"{sign}{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def _offset_at(zone: tzinfo, instant: datetime) -> tuple[timedelta, str]:
+    local = instant.astimezone(zone)
+    return local.utcoffset(), local.tzname()
+
+
+def _find_transition(zone: tzinfo, start: datetime, step: timedelta) -> datetime:
+    """
+    Looks for the zone's next transition after (or, with a negative step, its last transition before) an instant.
+    :param zone: The timezone to check
+    :param start: The instant to search from
+    :param step: How far to jump between checks. Transitions closer together than this may be missed.
+    :return: The first instant after the transition, or the end of the search if there wasn't one
+    """
+    start = start.replace(microsecond=0)
+    current = _offset_at(zone, start)
+    before = start
+    checked = timedelta(0)
+    while checked < SCAN_HORIZON:
+        after = before + step
+        if _offset_at(zone, after) != current:
+            break
+        before = after
+        checked += abs(step)
+    else:
+        return before
+
+    # Narrow the jump that crossed the transition down to the second
+    inside, outside = before, after
+    while abs(outside - inside) > timedelta(seconds=1):
+        middle = (inside + (outside - inside) / 2).replace(microsecond=0)
+        if _offset_at(zone, middle) == current:
+            inside = middle
+        else:
+            outside = middle
+    return outside if step > timedelta(0) else inside
+
+
+def _distance(zone_offset: ZoneOffset, instant: datetime) -> timedelta:
+    if zone_offset.covers(instant):
+        return timedelta(0)
+    if instant < zone_offset.valid_from:
+        return zone_offset.valid_from - instant
+    return instant - zone_offset.valid_until
+
+
+class ZoneRegistry:
+    """
+    Resolves timezone names once, and remembers each zone's current UTC offset until its next transition.
+
+    Converting a time is then a lookup and an addition, rather than a trip through the TZ database. Every TLDer in a
+    zone shares its offset. A few periods are kept for each zone, so converting a time the other side of a transition
+    doesn't evict the current one.
+    """
+
+    def __init__(self):
+        self.zones: dict[str, tzinfo] = {}
+        self.offsets: dict[str, list[ZoneOffset]] = {}
+        self.resolutions = 0
+
+    def zone(self, name: str) -> tzinfo:
+        """
+        :raises pytz.UnknownTimeZoneError: If the name isn't in the TZ database
+        """
+        if zone := self.zones.get(name):
+            return zone
+        zone = pytz.timezone(name)
+        self.zones[name] = zone
+        return zone
+
+    def _resolve(self, name: str, instant: datetime) -> ZoneOffset:
+        self.resolutions += 1
+        zone = self.zone(name)
+        offset, abbreviation = _offset_at(zone, instant)
+        zone_offset = ZoneOffset(
+            offset=offset,
+            abbreviation=abbreviation,
+            valid_from=_find_transition(zone, instant, -SCAN_STEP),
+            valid_until=_find_transition(zone, instant, SCAN_STEP),
+        )
+        log.debug(
+            f"{name} is UTC{zone_offset.format()} ({abbreviation}) until {zone_offset.valid_until}"
+        )
+        return zone_offset
+
+    def offset(self, name: str, instant: Optional[datetime] = None) -> ZoneOffset:
+        """
+        Gets a zone's offset from UTC.
+        :param name: The zone's name in the TZ database
+        :param instant: When to get the offset for. Defaults to now.
+        :return: The offset, and the period it applies for
+        """
+        now = datetime.now(timezone.utc)
+        instant = instant or now
+        periods = self.offsets.setdefault(name, [])
+        for zone_offset in periods:
+            if zone_offset.covers(instant):
+                return zone_offset
+        zone_offset = self._resolve(name, instant)
+        periods.append(zone_offset)
+        if len(periods) > MAX_PERIODS:
+            # Drop the period furthest from now, which is never the one covering it
+            periods.remove(max(periods, key=lambda period: _distance(period, now)))
+        return zone_offset
+
+    def local_time(self, name: str, instant: Optional[datetime] = None) -> datetime:
+        """
+        Converts an instant to local time in a zone.
+        :param name: The zone's name in the TZ database
+        :param instant: The time to convert. Defaults to now.
+        :return: The local time, with a fixed-offset tzinfo named after the zone's abbreviation
+        """
+        instant = (instant or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        zone_offset = self.offset(name, instant)
+        return (instant + zone_offset.offset).replace(tzinfo=zone_offset.tzinfo)
+
+    def local_times(
+        self, names: Iterable[str], instant: Optional[datetime] = None
+    ) -> list[datetime]:
+        instant = instant or datetime.now(timezone.utc)
+        return [self.local_time(name, instant) for name in names]
+
+    def to_utc(self, name: str, local: datetime) -> datetime:
+        """
+        Works out when a wall-clock time in a zone happens.
+        :param name: The zone's name in the TZ database
+        :param local: The wall-clock time. Any tzinfo is ignored.
+        :return: The instant, in UTC
+        """
+        wall = local.replace(tzinfo=timezone.utc)
+        zone_offset = self.offset(name)
+        instant = wall - zone_offset.offset
+        if not zone_offset.covers(instant):
+            # The time falls the other side of a transition
+            instant = wall - self.offset(name, instant).offset
+        return instant